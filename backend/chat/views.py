@@ -8,6 +8,7 @@ from django.views import View
 from django.views.generic import ListView, DetailView
 from django.db import transaction
 from .models import Conversation, Message
+from profiles.cache import friend_user_ids
 from django.contrib import messages
 
 User = get_user_model()
@@ -29,7 +30,9 @@ class ConversationListView(LoginRequiredMixin, ListView):
         )
         # Forzar evaluación y añadir atributos útiles para la plantilla
         convs = list(qs)
+        friend_ids = friend_user_ids(self.request.user.pk)
         for conv in convs:
+            conv.with_friend = any(p.pk in friend_ids for p in conv.participants.all() if p.pk != self.request.user.pk)
             try:
                 conv.unread_count = conv.messages.exclude(
                     read_by=self.request.user
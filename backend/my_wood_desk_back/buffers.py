@@ -0,0 +1,114 @@
+"""
+Buffers en memoria del proceso para escrituras de alta frecuencia.
+
+Cada worker acumula elementos y los vuelca a la base de datos en un solo
+lote cuando se alcanza `max_size` o pasan `max_age` segundos desde el
+primer elemento pendiente (un temporizador en segundo plano garantiza el
+volcado aunque no llegue más tráfico). Al terminar el proceso se vuelca lo
+pendiente con `atexit`. Lo que haya en memoria si el proceso muere de
+golpe se pierde: sólo para datos que toleran esa pérdida (analítica,
+contadores de visitas).
+"""
+import atexit
+import logging
+import threading
+import time
+import weakref
+from collections import Counter
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_buffers = weakref.WeakSet()
+
+
+class BatchBuffer:
+    """Lista de elementos que se vuelca con `flush_func(lista)`."""
+
+    def __init__(self, flush_func, max_size=500, max_age=5.0):
+        self.flush_func = flush_func
+        self.max_size = max_size
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._pending = self.new_batch()
+        self._started_at = None
+        self._timer = None
+        _buffers.add(self)
+
+    def new_batch(self):
+        return []
+
+    def append(self, batch, item):
+        batch.append(item)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, item):
+        if self.max_size <= 1:
+            # Sin buffer: volcar directamente
+            self._flush_batch(self._single(item))
+            return
+        with self._lock:
+            self.append(self._pending, item)
+            if self._started_at is None:
+                self._started_at = time.monotonic()
+                self._start_timer()
+            due = len(self) >= self.max_size or time.monotonic() - self._started_at >= self.max_age
+        if due:
+            self.flush()
+
+    def _single(self, item):
+        batch = self.new_batch()
+        self.append(batch, item)
+        return batch
+
+    def _start_timer(self):
+        self._timer = threading.Timer(self.max_age, self._timed_flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _timed_flush(self):
+        try:
+            self.flush()
+        finally:
+            # La conexión de este hilo no la cierra nadie más
+            connections.close_all()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, self.new_batch()
+            self._started_at = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if batch:
+            self._flush_batch(batch)
+
+    def _flush_batch(self, batch):
+        try:
+            self.flush_func(batch)
+        except Exception:
+            logger.exception('No se pudo volcar un lote de %s elementos', len(batch))
+
+
+class CounterBuffer(BatchBuffer):
+    """Cuenta apariciones por clave; el volcado recibe un Counter {clave: n}."""
+
+    def new_batch(self):
+        return Counter()
+
+    def append(self, batch, item):
+        batch[item] += 1
+
+    def __len__(self):
+        return sum(self._pending.values())
+
+
+def flush_all():
+    for buffer in list(_buffers):
+        buffer.flush()
+
+
+atexit.register(flush_all)
@@ -0,0 +1,20 @@
+"""Utilidades de base de datos compartidas entre apps."""
+from django.db import connections, router
+
+
+def upsert(model, objs, unique_fields, update_fields, batch_size=None):
+    """
+    INSERT ... ON CONFLICT DO UPDATE portable con bulk_create.
+    MySQL no admite indicar las columnas del conflicto (usa cualquier clave
+    única), así que sólo se pasan si el motor lo soporta.
+    """
+    connection = connections[router.db_for_write(model)]
+    if not connection.features.supports_update_conflicts_with_target:
+        unique_fields = None
+    return model._default_manager.bulk_create(
+        objs,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+    )
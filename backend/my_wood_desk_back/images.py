@@ -0,0 +1,186 @@
+"""
+Pipeline de imágenes subidas (Post.image, UserProfile.profile_picture).
+
+Por cada original se generan versiones redimensionadas ("renditions") en
+WebP y JPEG, sin metadatos EXIF, que se guardan junto al original en
+`<dir>/renditions/`. La generación corre en un pool de hilos y se lanza
+tras el commit de la transacción, nunca dentro de la request. Al terminar
+se envía `renditions_ready` (p. ej. para invalidar HTML cacheado).
+"""
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.images import get_image_dimensions
+from django.db import transaction
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# nombre -> ancho máximo en píxeles
+RENDITIONS = {
+    'thumb': 320,
+    'feed': 640,
+    'full': 1280,
+}
+
+# extensión -> (formato Pillow, opciones de guardado)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# La última rendition que se escribe; si existe, el set está completo.
+MARKER = ('full', 'jpg')
+
+_executor = None
+
+# Argumentos: storage, name
+renditions_ready = Signal()
+
+
+def rendition_name(name, rendition, ext):
+    """
+    `posts/images/foo.png` -> `posts/images/renditions/foo_png_feed.webp`.
+    La extensión del original forma parte del nombre: `foo.png` y `foo.jpg`
+    son blobs distintos aunque tengan el mismo contenido.
+    """
+    directory, filename = posixpath.split(name)
+    stem, original_ext = posixpath.splitext(filename)
+    if original_ext:
+        stem = f'{stem}_{original_ext[1:]}'
+    return posixpath.join(directory, 'renditions', f'{stem}_{rendition}.{ext}')
+
+
+def rendition_names(name):
+    """Todos los nombres de rendition de un original (el marcador al final)."""
+    names = [
+        rendition_name(name, rendition, ext)
+        for rendition in RENDITIONS
+        for ext in FORMATS
+        if (rendition, ext) != MARKER
+    ]
+    names.append(rendition_name(name, *MARKER))
+    return names
+
+
+def has_renditions(fieldfile):
+    if not fieldfile:
+        return False
+    return fieldfile.storage.exists(rendition_name(fieldfile.name, *MARKER))
+
+
+def rendition_url(fieldfile, rendition='feed', ext='jpg'):
+    return fieldfile.storage.url(rendition_name(fieldfile.name, rendition, ext))
+
+
+def srcset(fieldfile, ext='jpg'):
+    """
+    Valor para el atributo `srcset` con las renditions de un formato y su
+    ancho real: un original más estrecho que una rendition no se amplía, y
+    las que saldrían iguales se anuncian una sola vez.
+    """
+    # El marcador es la rendition más ancha: su ancho es min(full, original)
+    with fieldfile.storage.open(rendition_name(fieldfile.name, *MARKER), 'rb') as fh:
+        widest = get_image_dimensions(fh)[0] or RENDITIONS[MARKER[0]]
+    entries, seen = [], set()
+    for rendition, width in sorted(RENDITIONS.items(), key=lambda item: item[1]):
+        width = min(width, widest)
+        if width not in seen:
+            seen.add(width)
+            entries.append(f'{rendition_url(fieldfile, rendition, ext)} {width}w')
+    return ', '.join(entries)
+
+
+def _prepare(image, fmt):
+    """Normaliza el modo de color; JPEG no admite transparencia."""
+    if fmt == 'JPEG':
+        if image.mode in ('RGBA', 'LA', 'P'):
+            rgba = image.convert('RGBA')
+            background = Image.new('RGB', rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            return background
+        return image.convert('RGB') if image.mode != 'RGB' else image
+    if image.mode not in ('RGB', 'RGBA'):
+        return image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+    return image
+
+
+def _resize(image, width):
+    if image.width <= width:
+        return image.copy()
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def generate_renditions(storage, name, force=False):
+    """
+    Genera (de forma síncrona) todas las renditions de `name` en `storage`.
+    Devuelve False si ya existían y no se fuerza la regeneración.
+    """
+    marker = rendition_name(name, *MARKER)
+    if not force and storage.exists(marker):
+        return False
+
+    with storage.open(name, 'rb') as fh:
+        with Image.open(fh) as original:
+            # Aplicar la orientación EXIF antes de descartar los metadatos
+            source = ImageOps.exif_transpose(original)
+            source.load()
+
+    order = [(r, e) for r in RENDITIONS for e in FORMATS if (r, e) != MARKER] + [MARKER]
+    for rendition, ext in order:
+        fmt, options = FORMATS[ext]
+        resized = _prepare(_resize(source, RENDITIONS[rendition]), fmt)
+        buffer = BytesIO()
+        # Sin `exif=`/`icc_profile=` Pillow no copia metadatos del original
+        resized.save(buffer, fmt, **options)
+        # El almacenamiento reemplaza el fichero de forma atómica
+        storage.save(rendition_name(name, rendition, ext), ContentFile(buffer.getvalue()))
+    return True
+
+
+def delete_renditions(storage, name):
+    for target in rendition_names(name):
+        if storage.exists(target):
+            storage.delete(target)
+
+
+def _generate_safely(storage, name):
+    try:
+        if generate_renditions(storage, name):
+            renditions_ready.send(sender=None, storage=storage, name=name)
+    except Exception:
+        logger.exception('No se pudieron generar las renditions de %s', name)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_RENDITION_WORKERS', 2),
+            thread_name_prefix='renditions',
+        )
+    return _executor
+
+
+def schedule_renditions(fieldfile):
+    """
+    Encola la generación de renditions para después del commit.
+    Con IMAGE_RENDITION_WORKERS = 0 se generan en línea (útil en tests).
+    """
+    if not fieldfile:
+        return
+    storage, name = fieldfile.storage, fieldfile.name
+
+    def submit():
+        if getattr(settings, 'IMAGE_RENDITION_WORKERS', 2) == 0:
+            _generate_safely(storage, name)
+        else:
+            _get_executor().submit(_generate_safely, storage, name)
+
+    transaction.on_commit(submit)
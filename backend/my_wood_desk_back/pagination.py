@@ -0,0 +1,100 @@
+"""
+Paginación por cursor (keyset) para feeds ordenados de más nuevo a más viejo.
+
+A diferencia de Paginator no hace COUNT(*) ni OFFSET: cada página filtra por
+"(campo1, campo2) < último visto", que el índice resuelve directamente.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return not self.cursor
+
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if hasattr(v, 'isoformat') else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields):
+    """
+    Devuelve los valores del cursor convertidos con `to_python()` de cada
+    campo de `fields`, o None (primera página) si falta o no es válido.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != len(fields):
+        return None
+    try:
+        values = [field.to_python(value) for field, value in zip(fields, values)]
+    except (ValidationError, ValueError, TypeError):
+        return None
+    if any(value is None for value in values):
+        return None
+    return values
+
+
+def _model_field(model, path):
+    """Campo de `model` al final de `path` (admite 'pk' y relaciones con '__')."""
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+
+
+def _value(obj, path):
+    for attr in path.split('__'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def keyset_paginate(queryset, cursor, per_page, ordering=('-created_at', '-pk')):
+    """
+    Página de `queryset` posterior a `cursor` según `ordering` (sólo campos
+    descendentes; el último debe ser único, normalmente la pk).
+    """
+    fields = [f.lstrip('-') for f in ordering]
+    values = decode_cursor(cursor, [_model_field(queryset.model, f) for f in fields])
+    qs = queryset.order_by(*ordering)
+    if values is not None:
+        # (f1 < v1) OR (f1 = v1 AND f2 < v2) OR ...
+        condition = Q()
+        for i, field in enumerate(fields):
+            branch = Q(**{f'{field}__lt': values[i]})
+            for prev_field, prev_value in zip(fields[:i], values[:i]):
+                branch &= Q(**{prev_field: prev_value})
+            condition |= branch
+        qs = qs.filter(condition)
+
+    rows = list(qs[:per_page + 1])
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor([_value(rows[-1], f) for f in fields])
+    return KeysetPage(rows, next_cursor, cursor)
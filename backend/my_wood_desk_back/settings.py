@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from django.contrib.messages import constants as message_constants
 
@@ -17,6 +18,33 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Hilos para generar renditions de imágenes (0 = generar en línea)
+IMAGE_RENDITION_WORKERS = 2
+
+# Segundos que se cachean los resultados de la búsqueda de posts
+POST_SEARCH_CACHE_TIMEOUT = 60
+
+# Segundos de caché de página completa (sólo anónimos) para el listado y detalle de posts
+POSTS_PAGE_CACHE_TIMEOUT = 30
+
+# Segundos que se cachean los resultados de la búsqueda/autocompletado de usuarios
+USER_SEARCH_CACHE_TIMEOUT = 60
+
+# Eventos de interacción: se insertan en lotes de este tamaño o cada N segundos (1 = sin buffer)
+ENGAGEMENT_BUFFER_SIZE = 200
+ENGAGEMENT_FLUSH_INTERVAL = 5
+
+# Contador de vistas de posts: volcado por tamaño/intervalo y ventana (s) en la que un visitante cuenta una vez
+POST_VIEW_FLUSH_SIZE = 100
+POST_VIEW_FLUSH_INTERVAL = 10
+POST_VIEW_DEDUP_WINDOW = 30 * 60
+
+# Segundos de caché de la clasificación de estudio entre amigos
+STUDY_LEADERBOARD_TIMEOUT = 10 * 60
+
+# Segundos máximos de la foto en memoria del grafo social antes de reconstruirla
+SOCIAL_GRAPH_MAX_AGE = 5 * 60
+
 # SECURITY
 SECRET_KEY = 'django-insecure-1l70%&(lz!qow#wg^3bg_&-yt8dyh45gi+r8^eipm8-vk#)1%g'
 DEBUG = True
@@ -84,6 +112,33 @@ DATABASES = {
     }
 }
 
+# Caché. Tiene que ser compartida por todos los procesos: las versiones de
+# las tarjetas de posts, los conjuntos de relaciones y resúmenes de perfil,
+# las clasificaciones de estudio y la versión del grafo social se invalidan
+# desde el proceso que hace el cambio, y con LocMemCache (una por proceso)
+# los demás workers seguirían sirviendo lo viejo. LocMemCache sólo vale con
+# un único proceso (runserver); en producción definir REDIS_URL (requiere el
+# paquete `redis`), que además hace atómicos los incr()/add() de las versiones.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Carga request.user con su perfil en una sola consulta. Las sesiones
+# abiertas antes con ModelBackend se migran a este backend (profiles 0010)
+AUTHENTICATION_BACKENDS = [
+    'profiles.backends.ProfileModelBackend',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',},
@@ -0,0 +1,232 @@
+"""
+Almacenamiento de media direccionado por contenido.
+
+Cada subida se hashea (SHA-256) mientras se escribe en disco y se guarda una
+sola vez en `blobs/ab/cd/<digest><ext>`; subir la misma imagen dos veces
+devuelve el mismo nombre. Las referencias desde los modelos se cuentan en
+`posts.MediaBlob` y el blob se borra (con sus renditions) cuando nadie lo usa.
+Como el contenido de un nombre nunca cambia, se puede servir con
+`Cache-Control: immutable`.
+
+Una subida que reutiliza un blob existente le actualiza la fecha de
+modificación; `collect()` no borra blobs tocados hace menos de
+BLOB_GRACE_SECONDS, para no llevarse un fichero cuya referencia aún no se
+ha contado. Esos blobs quedan con refcount 0 hasta la siguiente pasada de
+`collect_unreferenced()` (comando `collect_blobs`, pensado para cron).
+"""
+import hashlib
+import logging
+import os
+import posixpath
+import tempfile
+import time
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils.functional import LazyObject
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = 'blobs'
+BLOB_GRACE_SECONDS = 60
+
+
+def blob_name(digest, ext):
+    return posixpath.join(BLOB_PREFIX, digest[:2], digest[2:4], f'{digest}{ext}')
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(f'{BLOB_PREFIX}/')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage que deduplica las subidas por su hash."""
+
+    def get_available_name(self, name, max_length=None):
+        # El nombre definitivo lo decide _save() a partir del contenido; los
+        # ficheros derivados dentro de blobs/ se sobrescriben
+        return name
+
+    def _write_tmp(self, content, hasher=None):
+        tmp_dir = self.path(posixpath.join(BLOB_PREFIX, 'tmp'))
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in content.chunks():
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path
+
+    def _move(self, tmp_path, name):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        if self.file_permissions_mode is not None:
+            os.chmod(path, self.file_permissions_mode)
+
+    def _save(self, name, content):
+        if is_blob(name):
+            # Ficheros derivados (renditions) que ya viven dentro de blobs/:
+            # reemplazo atómico, sin el bucle O_EXCL de FileSystemStorage
+            tmp_path = self._write_tmp(content)
+            try:
+                self._move(tmp_path, name)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            return name
+
+        hasher = hashlib.sha256()
+        tmp_path = self._write_tmp(content, hasher)
+        final_name = blob_name(hasher.hexdigest(), posixpath.splitext(name)[1].lower())
+        try:
+            try:
+                # Ya existe: marcar el uso para que collect() no lo borre ahora
+                os.utime(self.path(final_name))
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                self._move(tmp_path, final_name)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return final_name
+
+
+class _DefaultContentAddressedStorage(LazyObject):
+    def _setup(self):
+        self._wrapped = ContentAddressedStorage()
+
+
+content_addressed_storage = _DefaultContentAddressedStorage()
+
+
+def get_content_addressed_storage():
+    """Callable para `storage=` en los campos (serializable en migraciones)."""
+    return content_addressed_storage
+
+
+# Conteo de referencias
+
+def acquire(name, storage=None, count=1):
+    """Suma `count` referencias al blob `name` (crea la fila si no existe)."""
+    if not is_blob(name):
+        return
+    from posts.models import MediaBlob
+
+    storage = storage or content_addressed_storage
+    digest = posixpath.splitext(posixpath.basename(name))[0]
+    with transaction.atomic():
+        # Bloquea la fila frente a un collect() simultáneo del mismo blob
+        if not MediaBlob.objects.select_for_update().filter(name=name).exists():
+            MediaBlob.objects.get_or_create(
+                name=name,
+                defaults={'digest': digest, 'size': storage.size(name) if storage.exists(name) else 0},
+            )
+        MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + count)
+    if not storage.exists(name):
+        logger.error('Referencia a un blob que no está en disco: %s', name)
+
+
+def release(name, storage=None):
+    """Resta una referencia; si llega a cero, borra el blob tras el commit."""
+    if not is_blob(name):
+        return
+    from posts.models import MediaBlob
+
+    storage = storage or content_addressed_storage
+    MediaBlob.objects.filter(name=name, refcount__gt=0).update(refcount=F('refcount') - 1)
+    transaction.on_commit(lambda: collect(name, storage))
+
+
+def collect(name, storage=None):
+    """
+    Borra el blob y sus renditions si ya no tiene referencias. Devuelve
+    True si lo borró.
+    """
+    from my_wood_desk_back.images import delete_renditions
+    from posts.models import MediaBlob
+
+    storage = storage or content_addressed_storage
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(name=name, refcount=0).first()
+        if blob is None:
+            return False
+        try:
+            touched = os.path.getmtime(storage.path(name))
+        except FileNotFoundError:
+            touched = 0
+        if time.time() - touched < BLOB_GRACE_SECONDS:
+            # Una subida acaba de reutilizarlo y su acquire() está en camino;
+            # lo recoge la siguiente pasada de collect_unreferenced()
+            return False
+        delete_renditions(storage, name)
+        if storage.exists(name):
+            storage.delete(name)
+        blob.delete()
+    return True
+
+
+def collect_unreferenced(storage=None):
+    """
+    Pasa collect() por todos los blobs con refcount 0. Devuelve
+    (borrados, pendientes), donde pendientes son los que siguen dentro del
+    margen de BLOB_GRACE_SECONDS.
+    """
+    from posts.models import MediaBlob
+
+    collected = pending = 0
+    names = MediaBlob.objects.filter(refcount=0).values_list('name', flat=True)
+    for name in names.iterator():
+        if collect(name, storage):
+            collected += 1
+        else:
+            pending += 1
+    return collected, pending
+
+
+def track_file_references(model, field_name):
+    """
+    Mantiene el conteo de referencias de un FileField: suma al asignar un
+    fichero nuevo, resta al reemplazarlo o al borrar la instancia.
+    """
+    attr = f'_{field_name}_tracked_name'
+    uid = f'{model._meta.label_lower}.{field_name}'
+
+    def remember(sender, instance, **kwargs):
+        # Leer de __dict__ para no disparar la carga de un campo diferido;
+        # None significa "desconocido" y desactiva el seguimiento.
+        if field_name not in instance.__dict__:
+            setattr(instance, attr, None)
+            return
+        value = instance.__dict__[field_name]
+        setattr(instance, attr, getattr(value, 'name', value) or '')
+
+    def on_save(sender, instance, raw=False, **kwargs):
+        old = getattr(instance, attr, None)
+        if old is None or raw:
+            # raw: quien carga los datos cuenta las referencias (posts/transfer.py)
+            return
+        fieldfile = getattr(instance, field_name)
+        new = fieldfile.name or ''
+        if old != new:
+            acquire(new, fieldfile.storage)
+            release(old, fieldfile.storage)
+            setattr(instance, attr, new)
+
+    def on_delete(sender, instance, **kwargs):
+        name = getattr(instance, attr, None)
+        if name:
+            release(name, model._meta.get_field(field_name).storage)
+
+    post_init.connect(remember, sender=model, weak=False, dispatch_uid=f'{uid}.init')
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f'{uid}.save')
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f'{uid}.delete')
@@ -1,5 +1,6 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from .views import (
     HomeView,
     LoginView,
@@ -7,6 +8,7 @@ from .views import (
     RegisterView,
     DashboardView,
     LegalView,
+    serve_media,
 )
 
 urlpatterns = [
@@ -23,3 +25,8 @@ urlpatterns = [
     path('notifications/', include('notifications.urls', namespace='notifications')),
     path('study/', include(('study.urls', 'study'), namespace='study')),
 ]
+
+if settings.DEBUG:
+    urlpatterns += [
+        re_path(r'^media/(?P<path>.*)$', serve_media),
+    ]
@@ -6,8 +6,14 @@ from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth import login, logout
 from django.contrib import messages
 from django.views import View
+from django.views.static import serve
+from django.conf import settings
 from .forms import LoginForm, RegisterForm
-from study.models import StudySession
+from .storage import is_blob
+from posts.engagement import author_engagement
+from profiles.models import get_profile
+from study.leaderboard import friends_leaderboard
+from study.sessions import active_session
 
 """
 Vistas del proyecto "my_wood_desk_back":
@@ -17,6 +23,7 @@ Vistas del proyecto "my_wood_desk_back":
 - LogoutView: Logout simple.
 - RegisterView: Registro de usuarios con validación de email.
 - DashboardView: Panel principal del usuario con widgets básicos.
+- serve_media: Sirve MEDIA en desarrollo (blobs con caché inmutable).
 """
 
 
@@ -111,12 +118,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         ctx = super().get_context_data(**kwargs)
         user = self.request.user
 
-        # Intentar añadir perfil si existe
-        try:
-            profile = user.profile
-        except Exception:
-            profile = None
-        ctx['profile'] = profile
+        ctx['profile'] = get_profile(user)
 
         # Pasar querysets/listas, no RelatedManager
         try:
@@ -129,18 +131,31 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         except Exception:
             ctx['recent_posts'] = []
 
+        # Interacción con mis posts: lee los resúmenes diarios, no los eventos
+        ctx['engagement'] = author_engagement(user)
+
+        # Clasificación semanal con amigos (cacheada por usuario)
+        ctx['leaderboard'] = friends_leaderboard(user, 'week', limit=5)
+
         # Conversaciones (si existen)
         try:
             ctx['conversations'] = user.conversations.all().order_by('-updated_at')[:6]
         except Exception:
             ctx['conversations'] = []
 
-        # Estado de sesión de estudio activo
-        try:
-            ctx['active_session'] = StudySession.objects.filter(
-                user=user, end_time__isnull=True
-            ).select_related('subject').first()
-        except Exception:
-            ctx['active_session'] = None
+        # Estado de sesión de estudio activo (cacheado por usuario)
+        ctx['active_session'] = active_session(user)
 
         return ctx
+
+
+def serve_media(request, path):
+    """
+    Sirve ficheros de MEDIA_ROOT en desarrollo. Los blobs direccionados por
+    contenido no cambian nunca, así que se marcan como inmutables; en
+    producción el proxy inverso debe aplicar la misma cabecera a /media/blobs/.
+    """
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if is_blob(path):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Subject, Post
+from .counters import forget_subject_counts
+from .models import Subject, Post, PostSubject, MediaBlob, PostDailyEngagement, AuthorDailyEngagement
+from .search import index_posts
 
 
 @admin.register(Subject)
@@ -9,6 +11,12 @@ class SubjectAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
 
 
+class PostSubjectInline(admin.TabularInline):
+    model = PostSubject
+    fields = ('subject',)
+    extra = 1
+
+
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = (
@@ -18,13 +26,23 @@ class PostAdmin(admin.ModelAdmin):
         'created_at',
         'likes_count',
         'saves_count',
-        'is_public',
+        'audience',
     )
-    list_filter = ('is_public', 'subjects', 'created_at')
+    list_filter = ('audience', 'subjects', 'created_at')
     search_fields = ('user__username', 'caption')
     raw_id_fields = ('user',)
-    filter_horizontal = ('subjects', 'likes', 'saved_by')
-    readonly_fields = ('likes_count', 'saves_count', 'created_at', 'updated_at')
+    filter_horizontal = ('likes',)
+    readonly_fields = ('likes_count', 'saves_count', 'views_count', 'created_at', 'updated_at')
+    inlines = (PostSubjectInline,)
+
+    def save_related(self, request, form, formsets, change):
+        # El inline guarda filas de PostSubject sin pasar por m2m_changed
+        post = form.instance
+        before = set(post.subject_links.values_list('subject_id', flat=True))
+        super().save_related(request, form, formsets, change)
+        after = set(post.subject_links.values_list('subject_id', flat=True))
+        forget_subject_counts(before | after)
+        index_posts([post.pk])
 
     def get_subjects(self, obj):
         return ", ".join(s.name for s in obj.subjects.all())
@@ -37,3 +55,26 @@ class PostAdmin(admin.ModelAdmin):
     def saves_count(self, obj):
         return obj.saves_count
     saves_count.short_description = 'Guardados'
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'refcount', 'created_at')
+    search_fields = ('name', 'digest')
+    readonly_fields = ('name', 'digest', 'size', 'refcount', 'created_at')
+
+
+@admin.register(PostDailyEngagement)
+class PostDailyEngagementAdmin(admin.ModelAdmin):
+    list_display = ('post', 'day', 'views', 'likes', 'saves')
+    list_filter = ('day',)
+    raw_id_fields = ('post',)
+    date_hierarchy = 'day'
+
+
+@admin.register(AuthorDailyEngagement)
+class AuthorDailyEngagementAdmin(admin.ModelAdmin):
+    list_display = ('author', 'day', 'views', 'likes', 'saves')
+    list_filter = ('day',)
+    raw_id_fields = ('author',)
+    date_hierarchy = 'day'
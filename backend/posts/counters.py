@@ -0,0 +1,56 @@
+"""
+Número de posts públicos por asignatura, cacheado.
+
+Los handlers de m2m_changed (posts/signals.py) ajustan el contador con
+incr/decr; si la clave no está en caché se ignora el ajuste y se recalcula
+en la siguiente lectura con una única consulta agrupada.
+"""
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Post, PostSubject
+
+COUNT_TIMEOUT = 60 * 60 * 24
+
+
+def _key(subject_id):
+    return f'posts:subject:{subject_id}:count'
+
+
+def subject_post_counts(subject_ids):
+    """{subject_id: nº de posts públicos} para las asignaturas indicadas."""
+    subject_ids = list(subject_ids)
+    keys = {_key(pk): pk for pk in subject_ids}
+    cached = cache.get_many(keys)
+    counts = {keys[k]: v for k, v in cached.items()}
+
+    missing = [pk for pk in subject_ids if pk not in counts]
+    if missing:
+        rows = (
+            PostSubject.objects.filter(subject_id__in=missing, post__audience=Post.AUDIENCE_PUBLIC)
+            .values('subject_id')
+            .annotate(n=Count('id'))
+        )
+        fresh = {pk: 0 for pk in missing}
+        fresh.update({row['subject_id']: row['n'] for row in rows})
+        cache.set_many({_key(pk): n for pk, n in fresh.items()}, COUNT_TIMEOUT)
+        counts.update(fresh)
+    return counts
+
+
+def adjust_subject_counts(subject_ids, delta):
+    if not delta:
+        return
+    for pk in subject_ids:
+        try:
+            if delta > 0:
+                cache.incr(_key(pk), delta)
+            else:
+                cache.decr(_key(pk), -delta)
+        except ValueError:
+            # No cacheado: se recalculará al leerlo
+            pass
+
+
+def forget_subject_counts(subject_ids):
+    cache.delete_many([_key(pk) for pk in subject_ids])
@@ -0,0 +1,173 @@
+"""
+Analítica de interacción con posts.
+
+Las vistas registran eventos (vista, like, guardado...) con `record_event`;
+se acumulan en un buffer del proceso y se insertan con un `bulk_create`
+por lote. `rollup_days` agrega los eventos en resúmenes diarios por post y
+por autor (`rollup_engagement` lo ejecuta periódicamente) y los paneles
+leen esos resúmenes con `author_engagement`.
+
+`register_view` cuenta además la vista en `Post.views_count`: los
+incrementos se suman en memoria y se aplican con un único UPDATE por
+volcado, y cada visitante cuenta una vez por post dentro de la ventana
+POST_VIEW_DEDUP_WINDOW.
+"""
+import datetime
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.core.cache import cache
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from my_wood_desk_back.buffers import BatchBuffer, CounterBuffer
+from my_wood_desk_back.db import upsert
+from .models import AuthorDailyEngagement, EngagementEvent, Post, PostDailyEngagement
+
+ROLLUP_BATCH_SIZE = 500
+
+_buffer = None
+_view_buffer = None
+
+
+def _write_events(events):
+    try:
+        EngagementEvent.objects.bulk_create(events)
+    except IntegrityError:
+        # Algún post o usuario se borró mientras el evento esperaba en el
+        # buffer: se descarta el evento, o se queda sin actor (como SET_NULL)
+        posts = set(Post.objects.filter(pk__in={e.post_id for e in events}).values_list('pk', flat=True))
+        user_ids = {e.author_id for e in events} | {e.actor_id for e in events if e.actor_id is not None}
+        users = set(get_user_model().objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        kept = []
+        for event in events:
+            if event.post_id not in posts or event.author_id not in users:
+                continue
+            if event.actor_id not in users:
+                event.actor_id = None
+            kept.append(event)
+        EngagementEvent.objects.bulk_create(kept)
+
+
+def get_event_buffer():
+    global _buffer
+    if _buffer is None:
+        _buffer = BatchBuffer(
+            _write_events,
+            max_size=getattr(settings, 'ENGAGEMENT_BUFFER_SIZE', 200),
+            max_age=getattr(settings, 'ENGAGEMENT_FLUSH_INTERVAL', 5),
+        )
+    return _buffer
+
+
+def record_event(kind, post_id, author_id, actor=None):
+    get_event_buffer().add(EngagementEvent(
+        post_id=post_id,
+        author_id=author_id,
+        actor_id=actor.pk if actor is not None and actor.is_authenticated else None,
+        kind=kind,
+    ))
+
+
+# Contador de vistas
+
+def _write_view_counts(counts):
+    # Un solo UPDATE: views_count = views_count + CASE id WHEN ... END
+    Post.objects.filter(pk__in=counts).update(
+        views_count=F('views_count') + Case(
+            *[When(pk=pk, then=Value(n)) for pk, n in counts.items()],
+            default=Value(0),
+        )
+    )
+
+
+def get_view_buffer():
+    global _view_buffer
+    if _view_buffer is None:
+        _view_buffer = CounterBuffer(
+            _write_view_counts,
+            max_size=getattr(settings, 'POST_VIEW_FLUSH_SIZE', 100),
+            max_age=getattr(settings, 'POST_VIEW_FLUSH_INTERVAL', 10),
+        )
+    return _view_buffer
+
+
+def _viewer_key(request):
+    if request.user.is_authenticated:
+        return f'u{request.user.pk}'
+    if request.session.session_key:
+        return f's{request.session.session_key}'
+    # Anónimo sin sesión: IP + navegador
+    raw = f"{request.META.get('REMOTE_ADDR', '')}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return 'a' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def register_view(request, post_id, author_id):
+    """Cuenta una vista del post salvo que este visitante ya lo viera hace poco."""
+    window = getattr(settings, 'POST_VIEW_DEDUP_WINDOW', 30 * 60)
+    if window and not cache.add(f'posts:viewed:{post_id}:{_viewer_key(request)}', 1, window):
+        return False
+    get_view_buffer().add(post_id)
+    record_event(EngagementEvent.KIND_VIEW, post_id, author_id, request.user)
+    return True
+
+
+# Resúmenes diarios
+
+def _day_bounds(start, end):
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.datetime.combine(start, datetime.time.min), tz),
+        timezone.make_aware(datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min), tz),
+    )
+
+
+def _kind(kind):
+    return Count('id', filter=Q(kind=kind))
+
+
+_TOTALS = {
+    'views': _kind(EngagementEvent.KIND_VIEW),
+    'likes': _kind(EngagementEvent.KIND_LIKE) - _kind(EngagementEvent.KIND_UNLIKE),
+    'saves': _kind(EngagementEvent.KIND_SAVE) - _kind(EngagementEvent.KIND_UNSAVE),
+}
+
+
+def _rollup(events, key, model, unique_fields):
+    rows = events.values(key, 'day').annotate(**_TOTALS).order_by()
+    batch = []
+    for row in rows.iterator(chunk_size=ROLLUP_BATCH_SIZE):
+        batch.append(model(**row))
+        if len(batch) >= ROLLUP_BATCH_SIZE:
+            upsert(model, batch, unique_fields=unique_fields, update_fields=list(_TOTALS))
+            batch = []
+    upsert(model, batch, unique_fields=unique_fields, update_fields=list(_TOTALS))
+
+
+def rollup_days(start, end=None):
+    """
+    Recalcula los resúmenes de los días [start, end] a partir de los
+    eventos. Reescribe días completos, así que repetirlo es seguro.
+    """
+    end = end or start
+    since, until = _day_bounds(start, end)
+    events = (
+        EngagementEvent.objects.filter(created_at__gte=since, created_at__lt=until)
+        .annotate(day=TruncDate('created_at'))
+    )
+    _rollup(events, 'post_id', PostDailyEngagement, ['post', 'day'])
+    _rollup(events, 'author_id', AuthorDailyEngagement, ['author', 'day'])
+
+
+def author_engagement(author, days=30):
+    """Totales y serie diaria de los últimos `days` días de un autor."""
+    since = timezone.localdate() - datetime.timedelta(days=days - 1)
+    rows = AuthorDailyEngagement.objects.filter(author=author, day__gte=since).order_by('day')
+    totals = rows.aggregate(views=Sum('views'), likes=Sum('likes'), saves=Sum('saves'))
+    return {
+        'days': list(rows.values('day', 'views', 'likes', 'saves')),
+        'totals': {k: v or 0 for k, v in totals.items()},
+    }
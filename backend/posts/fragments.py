@@ -0,0 +1,97 @@
+"""
+Caché de fragmentos para las tarjetas de posts de los listados.
+
+La clave de cada tarjeta combina id, `updated_at` y una versión por post que
+se incrementa en cada like/guardado/cambio de asignaturas, al terminar las
+renditions de su imagen y al cambiar el nombre del autor (posts/signals.py),
+así que nunca hace falta borrar fragmentos: una clave nueva deja la vieja
+sin uso hasta que expira. Las vistas obtienen todas las tarjetas de una
+página con dos `get_many` y sólo renderizan las que faltan.
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+CARD_TEMPLATE = 'posts/_post_card.html'
+CARD_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(post_id):
+    return f'posts:card:{post_id}:v'
+
+
+def _fresh_version():
+    # Si la versión se expulsa de la caché, la nueva no coincide con ninguna anterior
+    return time.time_ns()
+
+
+def card_versions(post_ids):
+    keys = {_version_key(pk): pk for pk in post_ids}
+    found = cache.get_many(keys)
+    versions = {keys[k]: v for k, v in found.items()}
+    for key, pk in keys.items():
+        if pk not in versions:
+            version = _fresh_version()
+            cache.add(key, version, None)
+            versions[pk] = cache.get(key, version)
+    return versions
+
+
+def bump_card_versions(post_ids):
+    for pk in post_ids:
+        try:
+            cache.incr(_version_key(pk))
+        except ValueError:
+            cache.set(_version_key(pk), _fresh_version(), None)
+
+
+def card_key(post, version):
+    return f'posts:card:{post.pk}:{post.updated_at.timestamp():.6f}:{version}'
+
+
+def attach_cards(posts):
+    """Asigna `post.card_html` a cada post, renderizando sólo los que no estén en caché."""
+    versions = card_versions([p.pk for p in posts])
+    keyed = {card_key(p, versions[p.pk]): p for p in posts}
+    cached = cache.get_many(keyed)
+
+    missing = [p for k, p in keyed.items() if k not in cached]
+    if missing:
+        prefetch_related_objects(missing, 'subjects')
+
+    fresh = {}
+    for key, post in keyed.items():
+        html = cached.get(key)
+        if html is None:
+            html = fresh[key] = render_to_string(CARD_TEMPLATE, {'post': post})
+        post.card_html = mark_safe(html)
+    if fresh:
+        cache.set_many(fresh, CARD_TIMEOUT)
+
+
+def attach_viewer_state(posts, user):
+    """`viewer_liked` / `viewer_saved` para toda la página con dos consultas."""
+    liked = saved = set()
+    if user is not None and user.is_authenticated and posts:
+        ids = [p.pk for p in posts]
+        liked = set(
+            Post.likes.through.objects.filter(user=user, post_id__in=ids).values_list('post_id', flat=True)
+        )
+        saved = set(
+            Post.saved_by.through.objects.filter(user=user, post_id__in=ids).values_list('post_id', flat=True)
+        )
+    for post in posts:
+        post.viewer_liked = post.pk in liked
+        post.viewer_saved = post.pk in saved
+
+
+def prepare_post_cards(posts, user):
+    posts = list(posts)
+    attach_cards(posts)
+    attach_viewer_state(posts, user)
+    return posts
@@ -0,0 +1,64 @@
+import tempfile
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Post, Subject
+from posts.transfer import DEFAULT_CHUNK_SIZE, export_posts, import_posts
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el rendimiento de export_posts/import_posts con datos sintéticos. "
+        "Todo se hace dentro de una transacción que se deshace al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def _measure(self, label, rows, func):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f'{label}: {rows} posts en {elapsed:.2f}s ({rows / elapsed if elapsed else 0:.0f}/s), '
+            f'pico de memoria {peak / 1024 / 1024:.1f} MiB'
+        )
+        return result
+
+    def handle(self, *args, **options):
+        rows, chunk_size = options['rows'], options['chunk_size']
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create(username='__benchmark_post_transfer__')
+                subject = Subject.objects.create(name='__benchmark__', slug='benchmark-post-transfer')
+                posts = Post.objects.bulk_create(
+                    [Post(user=user, caption=f'Post de prueba {i}') for i in range(rows)],
+                    batch_size=chunk_size,
+                )
+                subject.posts.add(*posts)
+
+                # Fichero temporal en disco: el pico de memoria medido es el del proceso, no el del volcado
+                with tempfile.TemporaryFile('w+', encoding='utf-8') as dump:
+                    def export():
+                        for line in export_posts(Post.objects.filter(user=user), chunk_size=chunk_size):
+                            dump.write(line)
+
+                    self._measure('Exportación', rows, export)
+                    dump.seek(0)
+                    stats = self._measure('Importación', rows, lambda: import_posts(dump, batch_size=chunk_size))
+                self.stdout.write(str(stats))
+                raise _Rollback
+        except _Rollback:
+            pass
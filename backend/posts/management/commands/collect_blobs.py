@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from my_wood_desk_back.storage import BLOB_GRACE_SECONDS, collect_unreferenced
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra los blobs de media sin referencias (y sus renditions). Recoge los que "
+        f"se liberaron dentro del margen de {BLOB_GRACE_SECONDS} s; pensado para cron."
+    )
+
+    def handle(self, *args, **options):
+        collected, pending = collect_unreferenced()
+        self.stdout.write(self.style.SUCCESS(
+            f'Blobs borrados: {collected}, aún dentro del margen: {pending}'
+        ))
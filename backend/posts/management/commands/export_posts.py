@@ -0,0 +1,37 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.transfer import DEFAULT_CHUNK_SIZE, export_posts
+
+
+class Command(BaseCommand):
+    help = "Exporta los posts a JSON Lines (un post por línea) con memoria constante."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', nargs='?', default='-', help='Fichero de salida ("-" para stdout).')
+        parser.add_argument('--user', action='append', dest='users', help='Sólo posts de este usuario (repetible).')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options['users']:
+            queryset = queryset.filter(user__username__in=options['users'])
+
+        out = sys.stdout if options['output'] == '-' else open(options['output'], 'w', encoding='utf-8')
+        started = time.perf_counter()
+        total = 0
+        try:
+            for line in export_posts(queryset, chunk_size=options['chunk_size']):
+                out.write(line)
+                total += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(
+            f'Posts exportados: {total} en {elapsed:.2f}s ({total / elapsed if elapsed else 0:.0f}/s)'
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from my_wood_desk_back.images import generate_renditions
+from posts.models import Post
+from profiles.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Genera las renditions WebP/JPEG de las imágenes ya subidas (posts y perfiles)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerar aunque ya existan.')
+
+    def handle(self, *args, **options):
+        sources = [
+            Post.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True),
+            UserProfile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+            .values_list('profile_picture', flat=True),
+        ]
+        fields = [Post._meta.get_field('image'), UserProfile._meta.get_field('profile_picture')]
+
+        generated = skipped = failed = 0
+        for field, names in zip(fields, sources):
+            for name in names.iterator():
+                try:
+                    if generate_renditions(field.storage, name, force=options['force']):
+                        generated += 1
+                    else:
+                        skipped += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'{name}: {exc}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Renditions generadas: {generated}, ya existentes: {skipped}, errores: {failed}'
+        ))
@@ -0,0 +1,32 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import DEFAULT_CHUNK_SIZE, import_posts
+
+
+class Command(BaseCommand):
+    help = "Importa posts desde JSON Lines en lotes con bulk_create."
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', nargs='?', default='-', help='Fichero de entrada ("-" para stdin).')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        source = sys.stdin if options['input'] == '-' else open(options['input'], encoding='utf-8')
+        started = time.perf_counter()
+        try:
+            stats = import_posts(source, batch_size=options['batch_size'])
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        elapsed = time.perf_counter() - started
+        for error in stats.errors:
+            self.stderr.write(error)
+        if stats.error_count > len(stats.errors):
+            self.stderr.write(f'... y {stats.error_count - len(stats.errors)} errores más')
+        self.stdout.write(self.style.SUCCESS(
+            f'Importación terminada en {elapsed:.2f}s ({stats.created / elapsed if elapsed else 0:.0f} posts/s) — {stats}'
+        ))
@@ -0,0 +1,39 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from posts.engagement import rollup_days
+from posts.models import EngagementEvent
+
+
+class Command(BaseCommand):
+    help = (
+        "Agrega los eventos de interacción en los resúmenes diarios por post y por autor. "
+        "Por defecto recalcula ayer y hoy; pensado para ejecutarse periódicamente (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2, help='Días hacia atrás a recalcular (incluye hoy).')
+        parser.add_argument('--since', help='Recalcular desde esta fecha (AAAA-MM-DD) hasta hoy.')
+        parser.add_argument('--all', action='store_true', help='Recalcular desde el primer evento registrado.')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        if options['all']:
+            first = EngagementEvent.objects.aggregate(first=Min('created_at'))['first']
+            if first is None:
+                self.stdout.write('No hay eventos.')
+                return
+            start = timezone.localtime(first).date()
+        elif options['since']:
+            try:
+                start = datetime.date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since debe tener formato AAAA-MM-DD')
+        else:
+            start = today - datetime.timedelta(days=max(options['days'], 1) - 1)
+
+        rollup_days(start, today)
+        self.stdout.write(self.style.SUCCESS(f'Resúmenes recalculados del {start} al {today}.'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:39
+
+import my_wood_desk_back.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_alter_post_caption'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='nombre')),
+                ('digest', models.CharField(db_index=True, max_length=64, verbose_name='sha256')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='tamaño')),
+                ('refcount', models.PositiveIntegerField(default=0, verbose_name='referencias')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='creado el')),
+            ],
+            options={
+                'verbose_name': 'blob de media',
+                'verbose_name_plural': 'blobs de media',
+            },
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, help_text='Imagen, esquema o captura (opcional).', null=True, storage=my_wood_desk_back.storage.get_content_addressed_storage, upload_to='posts/images/', verbose_name='imagen'),
+        ),
+    ]
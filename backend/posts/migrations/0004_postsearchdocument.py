@@ -0,0 +1,86 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+FTS_TABLE = 'posts_postsearchdocument_fts'
+DOC_TABLE = 'posts_postsearchdocument'
+
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        caption, subjects,
+        content='{DOC_TABLE}', content_rowid='post_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {DOC_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, caption, subjects) VALUES (new.post_id, new.caption, new.subjects);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {DOC_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, caption, subjects) VALUES ('delete', old.post_id, old.caption, old.subjects);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {DOC_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, caption, subjects) VALUES ('delete', old.post_id, old.caption, old.subjects);
+        INSERT INTO {FTS_TABLE}(rowid, caption, subjects) VALUES (new.post_id, new.caption, new.subjects);
+    END""",
+]
+SQLITE_BACKWARD = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+MYSQL_FORWARD = [f'ALTER TABLE {DOC_TABLE} ADD FULLTEXT INDEX posts_search_ft (caption, subjects)']
+MYSQL_BACKWARD = [f'ALTER TABLE {DOC_TABLE} DROP INDEX posts_search_ft']
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_FORWARD, 'mysql': MYSQL_FORWARD})
+
+
+def drop_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_BACKWARD, 'mysql': MYSQL_BACKWARD})
+
+
+def index_existing_posts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostSearchDocument = apps.get_model('posts', 'PostSearchDocument')
+    batch = []
+    for post in Post.objects.prefetch_related('subjects').iterator(chunk_size=500):
+        batch.append(PostSearchDocument(
+            post_id=post.pk,
+            caption=post.caption or '',
+            subjects=' '.join(s.name for s in post.subjects.all()),
+        ))
+        if len(batch) >= 500:
+            PostSearchDocument.objects.bulk_create(batch)
+            batch = []
+    PostSearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0003_mediablob_alter_post_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchDocument',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='posts.post')),
+                ('caption', models.TextField(blank=True)),
+                ('subjects', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'documento de búsqueda',
+                'verbose_name_plural': 'documentos de búsqueda',
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(index_existing_posts, migrations.RunPython.noop),
+    ]
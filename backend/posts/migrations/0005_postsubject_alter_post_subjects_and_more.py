@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_post_created_at(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostSubject = apps.get_model('posts', 'PostSubject')
+    PostSubject.objects.filter(post_created_at__isnull=True).update(
+        post_created_at=Subquery(Post.objects.filter(pk=OuterRef('post_id')).values('created_at')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_postsearchdocument'),
+    ]
+
+    operations = [
+        # La tabla posts_post_subjects ya existe (M2M auto-creado): sólo
+        # cambia el estado de las migraciones, no la base de datos.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='PostSubject',
+                    fields=[
+                        ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_links', to='posts.post')),
+                        ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_links', to='posts.subject')),
+                    ],
+                    options={
+                        'db_table': 'posts_post_subjects',
+                        'unique_together': {('post', 'subject')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='post',
+                    name='subjects',
+                    field=models.ManyToManyField(blank=True, help_text='Etiquetas de las asignaturas relacionadas con el post.', related_name='posts', through='posts.PostSubject', to='posts.subject', verbose_name='asignaturas'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='postsubject',
+            name='post_created_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='postsubject',
+            index=models.Index(fields=['subject', '-post_created_at', 'post'], name='posts_subject_feed_idx'),
+        ),
+        migrations.RunPython(fill_post_created_at, migrations.RunPython.noop),
+    ]
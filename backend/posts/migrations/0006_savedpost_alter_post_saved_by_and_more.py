@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:46
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_postsubject_alter_post_subjects_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # La tabla posts_post_saved_by ya existe (M2M auto-creado): sólo
+        # cambia el estado de las migraciones, no la base de datos.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='SavedPost',
+                    fields=[
+                        ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='save_links', to='posts.post')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_saves', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'verbose_name': 'post guardado',
+                        'verbose_name_plural': 'posts guardados',
+                        'db_table': 'posts_post_saved_by',
+                        'unique_together': {('post', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='post',
+                    name='saved_by',
+                    field=models.ManyToManyField(blank=True, related_name='saved_posts', through='posts.SavedPost', to=settings.AUTH_USER_MODEL, verbose_name='guardado por'),
+                ),
+            ],
+        ),
+        # Los guardados existentes reciben la fecha de la migración; entre
+        # ellos el orden de inserción se conserva por el desempate en id.
+        migrations.AddField(
+            model_name='savedpost',
+            name='saved_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='guardado el'),
+        ),
+        migrations.AddIndex(
+            model_name='savedpost',
+            index=models.Index(fields=['user', '-saved_at', '-id'], name='posts_saved_user_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def audience_from_is_public(apps, schema_editor):
+    # Hasta ahora los posts no públicos sólo los veía su autor
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.filter(is_public=False).update(audience='private')
+
+
+def is_public_from_audience(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.exclude(audience='public').update(is_public=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_post_posts_user_feed_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='audience',
+            field=models.CharField(choices=[('public', 'Público'), ('followers', 'Seguidores'), ('friends', 'Amigos'), ('private', 'Sólo yo')], default='public', help_text='Seguidores incluye también a los amigos.', max_length=10, verbose_name='visible para'),
+        ),
+        migrations.RunPython(audience_from_is_public, is_public_from_audience),
+        migrations.RemoveField(
+            model_name='post',
+            name='is_public',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['audience', '-created_at', '-id'], name='posts_audience_feed_idx'),
+        ),
+    ]
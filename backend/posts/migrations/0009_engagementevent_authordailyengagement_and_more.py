@@ -0,0 +1,64 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_remove_post_is_public_post_audience_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EngagementEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('view', 'Vista'), ('like', 'Like'), ('unlike', 'Quitar like'), ('save', 'Guardado'), ('unsave', 'Quitar guardado')], max_length=10, verbose_name='tipo')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='fecha')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='engagement_events', to='posts.post')),
+            ],
+            options={
+                'verbose_name': 'evento de interacción',
+                'verbose_name_plural': 'eventos de interacción',
+            },
+        ),
+        migrations.CreateModel(
+            name='AuthorDailyEngagement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='día')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='vistas')),
+                ('likes', models.IntegerField(default=0, verbose_name='likes')),
+                ('saves', models.IntegerField(default=0, verbose_name='guardados')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_engagement', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'interacción diaria por autor',
+                'verbose_name_plural': 'interacciones diarias por autor',
+                'unique_together': {('author', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PostDailyEngagement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='día')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='vistas')),
+                ('likes', models.IntegerField(default=0, verbose_name='likes')),
+                ('saves', models.IntegerField(default=0, verbose_name='guardados')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_engagement', to='posts.post')),
+            ],
+            options={
+                'verbose_name': 'interacción diaria por post',
+                'verbose_name_plural': 'interacciones diarias por post',
+                'unique_together': {('post', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_views_count'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='postsubject',
+            name='posts_subject_feed_idx',
+        ),
+        migrations.AddIndex(
+            model_name='postsubject',
+            index=models.Index(fields=['subject', '-post_created_at', '-post'], name='posts_subject_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_postsubject_feed_idx_desc'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='import_key',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,72 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+class AnonymousPageCacheMixin:
+    """
+    Respuestas condicionales (ETag / Last-Modified -> 304) y caché de página
+    completa de vida corta para visitantes anónimos.
+
+    La vista define `get_validators()` devolviendo `(huella, last_modified)`
+    calculados con consultas baratas (ids, updated_at, versiones); la huella
+    forma el ETag y la clave de caché, por lo que cualquier cambio en los
+    posts de la página genera una clave nueva. Los usuarios autenticados ven
+    estado personalizado (likes, guardados, contadores del header) y siempre
+    reciben la página recién renderizada con `Cache-Control: private`.
+    """
+    page_cache_timeout = None
+
+    def get_validators(self):
+        raise NotImplementedError
+
+    def get_page_cache_timeout(self):
+        if self.page_cache_timeout is not None:
+            return self.page_cache_timeout
+        return getattr(settings, 'POSTS_PAGE_CACHE_TIMEOUT', 30)
+
+    def _is_cacheable(self, request):
+        return (
+            request.method in ('GET', 'HEAD')
+            and not request.user.is_authenticated
+            # no cachear una página que muestra mensajes flash de este visitante
+            and not len(get_messages(request))
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self._is_cacheable(request):
+            response = super().dispatch(request, *args, **kwargs)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True)
+            return response
+
+        validators = self.get_validators()
+        if validators is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        fingerprint, last_modified = validators
+        digest = hashlib.md5(f'{request.get_full_path()}|{fingerprint}'.encode()).hexdigest()
+        etag = quote_etag(digest)
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            key = f'posts:page:{digest}'
+            response = cache.get(key)
+            if response is None:
+                response = super().dispatch(request, *args, **kwargs)
+                if hasattr(response, 'render'):
+                    response.render()
+                if response.status_code == 200:
+                    cache.set(key, response, self.get_page_cache_timeout())
+
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, public=True, max_age=self.get_page_cache_timeout())
+        patch_vary_headers(response, ('Cookie',))
+        return response
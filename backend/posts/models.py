@@ -3,6 +3,9 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from my_wood_desk_back.storage import get_content_addressed_storage
+from profiles.models import UserProfile
+
 
 class Subject(models.Model):
     """Asignatura / tag de la materia (para etiquetar posts)."""
@@ -18,6 +21,17 @@ class Subject(models.Model):
         return self.name
 
 
+def _related_user_ids(relation, user_id):
+    """Subconsulta SQL con los user_id de `relation` ('friends'/'following') de `user_id`."""
+    through = getattr(UserProfile, relation).through
+    return through.objects.filter(from_userprofile__user_id=user_id).values('to_userprofile__user_id')
+
+
+class PostQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        return self.filter(Post.visibility_q(user))
+
+
 class Post(models.Model):
     """Contenido compartido por usuarios + tags de asignatura."""
     user = models.ForeignKey(
@@ -28,6 +42,7 @@ class Post(models.Model):
     )
     subjects = models.ManyToManyField(
         Subject,
+        through='PostSubject',
         blank=True,
         related_name='posts',
         verbose_name=_('asignaturas'),
@@ -36,6 +51,7 @@ class Post(models.Model):
     image = models.ImageField(
         _('imagen'),
         upload_to='posts/images/',
+        storage=get_content_addressed_storage,
         null=True,
         blank=True,
         help_text=_('Imagen, esquema o captura (opcional).'),
@@ -67,28 +83,106 @@ class Post(models.Model):
     saved_by = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
         blank=True,
+        through='SavedPost',
         related_name='saved_posts',
         verbose_name=_('guardado por'),
     )
 
-    is_public = models.BooleanField(
-        _('público'),
-        default=True,
-        help_text=_('Si es False, el post sólo será visible para el autor o seguidores si la lógica lo permite.'),
+    AUDIENCE_PUBLIC = 'public'
+    AUDIENCE_FOLLOWERS = 'followers'
+    AUDIENCE_FRIENDS = 'friends'
+    AUDIENCE_PRIVATE = 'private'
+    AUDIENCE_CHOICES = [
+        (AUDIENCE_PUBLIC, _('Público')),
+        (AUDIENCE_FOLLOWERS, _('Seguidores')),
+        (AUDIENCE_FRIENDS, _('Amigos')),
+        (AUDIENCE_PRIVATE, _('Sólo yo')),
+    ]
+    audience = models.CharField(
+        _('visible para'),
+        max_length=10,
+        choices=AUDIENCE_CHOICES,
+        default=AUDIENCE_PUBLIC,
+        help_text=_('Seguidores incluye también a los amigos.'),
     )
 
+    # Se incrementa en lote desde posts/engagement.py (register_view)
+    views_count = models.PositiveIntegerField(_('vistas'), default=0, editable=False)
+
+    # Clave temporal con la que posts/transfer.py recupera las pks de un
+    # bulk_create en motores sin RETURNING (MySQL); vacía fuera de la importación
+    import_key = models.UUIDField(null=True, blank=True, editable=False, db_index=True)
+
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('post')
         verbose_name_plural = _('posts')
         ordering = ('-created_at',)
         indexes = [
             models.Index(fields=['created_at']),
+            # Perfil de un usuario: filtro + orden por cursor sin ordenar en memoria
+            models.Index(fields=['user', '-created_at', '-id'], name='posts_user_feed_idx'),
+            models.Index(fields=['audience', '-created_at', '-id'], name='posts_audience_feed_idx'),
         ]
 
     def __str__(self):
         snippet = (self.caption[:40] + '...') if self.caption and len(self.caption) > 43 else (self.caption or f'Post {self.pk}')
         return f'{self.user.username}: {snippet}'
 
+    def save(self, *args, **kwargs):
+        # views_count sólo se escribe con UPDATE desde posts/engagement.py: una
+        # instancia cargada antes de un volcado no debe pisarlo con lo viejo
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = {
+                    field.attname for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname != 'views_count'
+                }
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    # Visibilidad
+    @property
+    def is_public(self):
+        return self.audience == self.AUDIENCE_PUBLIC
+
+    @classmethod
+    def visibility_q(cls, user, prefix=''):
+        """
+        Condición SQL de "posts que `user` puede ver". `prefix` permite
+        aplicarla desde otra tabla (p. ej. 'post__' en PostSubject).
+        Amigos y seguidos van como subconsultas y no desde la caché de
+        profiles/cache.py: es control de acceso y la caché puede ir con
+        retraso en otros procesos tras dejar de ser amigos o de seguir.
+        """
+        def q(**lookups):
+            return models.Q(**{f'{prefix}{k}': v for k, v in lookups.items()})
+
+        visible = q(audience=cls.AUDIENCE_PUBLIC)
+        if user is None or not user.is_authenticated:
+            return visible
+        friends = _related_user_ids('friends', user.pk)
+        visible |= q(user_id=user.pk)
+        visible |= q(audience__in=[cls.AUDIENCE_FRIENDS, cls.AUDIENCE_FOLLOWERS], user_id__in=friends)
+        visible |= q(audience=cls.AUDIENCE_FOLLOWERS, user_id__in=_related_user_ids('following', user.pk))
+        return visible
+
+    def is_visible_to(self, user):
+        if self.is_public or (user and user.is_authenticated and user.pk == self.user_id):
+            return True
+        if not user or not user.is_authenticated:
+            return False
+        relations = {
+            self.AUDIENCE_FRIENDS: ['friends'],
+            self.AUDIENCE_FOLLOWERS: ['friends', 'following'],
+        }.get(self.audience, [])
+        return any(
+            _related_user_ids(relation, user.pk).filter(to_userprofile__user_id=self.user_id).exists()
+            for relation in relations
+        )
+
     # Contadores y utilidades
     @property
     def likes_count(self):
@@ -145,3 +239,166 @@ class Post(models.Model):
         Ajusta pesos según necesidad.
         """
         return self.likes_count * likes_weight + self.saves_count * saves_weight
+
+
+class PostSubject(models.Model):
+    """
+    Tabla intermedia Post <-> Subject. Copia la fecha del post para que el
+    feed de una asignatura se resuelva sólo con el índice
+    (subject, -post_created_at, -post), sin ordenar tras el join.
+    """
+    # Misma pk que la tabla auto-creada que reemplaza (DEFAULT_AUTO_FIELD)
+    id = models.BigAutoField(primary_key=True)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='subject_links')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='post_links')
+    # Se rellena en el handler m2m_changed (add() no llama a save())
+    post_created_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'posts_post_subjects'
+        unique_together = ('post', 'subject')
+        indexes = [
+            models.Index(fields=['subject', '-post_created_at', '-post'], name='posts_subject_feed_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} - {self.subject_id}'
+
+    def save(self, *args, **kwargs):
+        if self.post_created_at is None:
+            self.post_created_at = self.post.created_at
+        super().save(*args, **kwargs)
+
+
+class SavedPost(models.Model):
+    """
+    Tabla intermedia Post <-> usuario que lo guardó, con la fecha del
+    guardado para listar "mis guardados" por el índice (user, -saved_at).
+    """
+    # Misma pk que la tabla auto-creada que reemplaza (DEFAULT_AUTO_FIELD)
+    id = models.BigAutoField(primary_key=True)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='save_links')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='post_saves')
+    # add()/set() usan el default al insertar
+    saved_at = models.DateTimeField(_('guardado el'), default=timezone.now)
+
+    class Meta:
+        db_table = 'posts_post_saved_by'
+        unique_together = ('post', 'user')
+        indexes = [
+            models.Index(fields=['user', '-saved_at', '-id'], name='posts_saved_user_idx'),
+        ]
+        verbose_name = _('post guardado')
+        verbose_name_plural = _('posts guardados')
+
+    def __str__(self):
+        return f'{self.user_id} - {self.post_id}'
+
+
+class MediaBlob(models.Model):
+    """
+    Fichero único del almacenamiento direccionado por contenido, con el
+    número de campos (Post.image, UserProfile.profile_picture) que lo usan.
+    """
+    name = models.CharField(_('nombre'), max_length=255, unique=True)
+    digest = models.CharField(_('sha256'), max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(_('tamaño'), default=0)
+    refcount = models.PositiveIntegerField(_('referencias'), default=0)
+    created_at = models.DateTimeField(_('creado el'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('blob de media')
+        verbose_name_plural = _('blobs de media')
+
+    def __str__(self):
+        return f'{self.name} ({self.refcount})'
+
+
+class PostSearchDocument(models.Model):
+    """
+    Texto indexable de un post (caption + nombres de asignaturas).
+    Sobre esta tabla se crea el índice full-text del motor: FTS5 en SQLite,
+    FULLTEXT en MySQL (ver posts/search.py y la migración 0004).
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document',
+    )
+    caption = models.TextField(blank=True)
+    subjects = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = _('documento de búsqueda')
+        verbose_name_plural = _('documentos de búsqueda')
+
+
+class EngagementEvent(models.Model):
+    """
+    Registro append-only de interacciones con posts. Se escribe en lotes
+    (posts/engagement.py) y el comando `rollup_engagement` lo agrega en
+    las tablas diarias; los paneles leen sólo esas tablas.
+    """
+    KIND_VIEW = 'view'
+    KIND_LIKE = 'like'
+    KIND_UNLIKE = 'unlike'
+    KIND_SAVE = 'save'
+    KIND_UNSAVE = 'unsave'
+    KIND_CHOICES = [
+        (KIND_VIEW, _('Vista')),
+        (KIND_LIKE, _('Like')),
+        (KIND_UNLIKE, _('Quitar like')),
+        (KIND_SAVE, _('Guardado')),
+        (KIND_UNSAVE, _('Quitar guardado')),
+    ]
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='engagement_events')
+    # Autor del post copiado aquí para agregar por autor sin join
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+    )
+    kind = models.CharField(_('tipo'), max_length=10, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(_('fecha'), default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = _('evento de interacción')
+        verbose_name_plural = _('eventos de interacción')
+
+    def __str__(self):
+        return f'{self.kind} {self.post_id} ({self.created_at:%Y-%m-%d %H:%M})'
+
+
+class PostDailyEngagement(models.Model):
+    """Resumen diario por post. Likes y guardados son netos (altas - bajas)."""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='daily_engagement')
+    day = models.DateField(_('día'))
+    views = models.PositiveIntegerField(_('vistas'), default=0)
+    likes = models.IntegerField(_('likes'), default=0)
+    saves = models.IntegerField(_('guardados'), default=0)
+
+    class Meta:
+        unique_together = ('post', 'day')
+        verbose_name = _('interacción diaria por post')
+        verbose_name_plural = _('interacciones diarias por post')
+
+    def __str__(self):
+        return f'{self.post_id} {self.day}'
+
+
+class AuthorDailyEngagement(models.Model):
+    """Resumen diario de todos los posts de un autor."""
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_engagement')
+    day = models.DateField(_('día'))
+    views = models.PositiveIntegerField(_('vistas'), default=0)
+    likes = models.IntegerField(_('likes'), default=0)
+    saves = models.IntegerField(_('guardados'), default=0)
+
+    class Meta:
+        unique_together = ('author', 'day')
+        verbose_name = _('interacción diaria por autor')
+        verbose_name_plural = _('interacciones diarias por autor')
+
+    def __str__(self):
+        return f'{self.author_id} {self.day}'
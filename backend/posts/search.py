@@ -0,0 +1,113 @@
+"""
+Búsqueda full-text de posts sobre caption y asignaturas.
+
+El índice (`PostSearchDocument`) se mantiene de forma incremental desde las
+señales de posts/signals.py. La consulta usa el motor nativo de la base de
+datos: FTS5 con ranking bm25 en SQLite y MATCH ... AGAINST en MySQL; en otros
+motores cae a un `icontains` sobre el documento. Los ids rankeados de cada
+consulta se cachean unos segundos, la visibilidad se aplica después.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+
+from my_wood_desk_back.db import upsert
+from .models import Post, PostSearchDocument
+
+FTS_TABLE = 'posts_postsearchdocument_fts'
+MAX_RESULTS = 200
+MAX_TERMS = 8
+
+# Pesos de columna para bm25 (caption, subjects): una asignatura pesa más
+SUBJECT_WEIGHT = 2.0
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return _TOKEN_RE.findall((query or '').lower())[:MAX_TERMS]
+
+
+# Mantenimiento del índice
+
+def index_posts(post_ids):
+    """(Re)indexa los posts indicados; los borrados caen por CASCADE."""
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    posts = Post.objects.filter(pk__in=post_ids).prefetch_related('subjects').only('pk', 'caption')
+    documents = [
+        PostSearchDocument(
+            post_id=post.pk,
+            caption=post.caption or '',
+            subjects=' '.join(s.name for s in post.subjects.all()),
+        )
+        for post in posts
+    ]
+    upsert(PostSearchDocument, documents, unique_fields=['post'], update_fields=['caption', 'subjects'])
+
+
+# Consulta
+
+def _sqlite_ids(terms, limit):
+    match = ' '.join('"{}"*'.format(t.replace('"', '')) for t in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}, 1.0, %s) LIMIT %s',
+            [match, SUBJECT_WEIGHT, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _mysql_ids(terms, limit):
+    boolean_query = ' '.join(f'+{t}*' for t in terms)
+    table = PostSearchDocument._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT post_id, MATCH(caption, subjects) AGAINST (%s IN BOOLEAN MODE) AS score '
+            f'FROM {table} WHERE MATCH(caption, subjects) AGAINST (%s IN BOOLEAN MODE) '
+            f'ORDER BY score DESC LIMIT %s',
+            [boolean_query, boolean_query, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_ids(terms, limit):
+    qs = PostSearchDocument.objects.all()
+    for term in terms:
+        qs = qs.filter(Q(caption__icontains=term) | Q(subjects__icontains=term))
+    return list(qs.order_by('-post_id').values_list('post_id', flat=True)[:limit])
+
+
+def ranked_post_ids(query, limit=MAX_RESULTS):
+    """Ids de posts que coinciden con `query`, de más a menos relevante (cacheado)."""
+    terms = tokenize(query)
+    if not terms:
+        return []
+
+    digest = hashlib.md5(' '.join(terms).encode()).hexdigest()
+    key = f'posts:search:{digest}:{limit}'
+    ids = cache.get(key)
+    if ids is None:
+        if connection.vendor == 'sqlite':
+            ids = _sqlite_ids(terms, limit)
+        elif connection.vendor == 'mysql':
+            ids = _mysql_ids(terms, limit)
+        else:
+            ids = _fallback_ids(terms, limit)
+        cache.set(key, ids, getattr(settings, 'POST_SEARCH_CACHE_TIMEOUT', 60))
+    return ids
+
+
+def search_post_ids(query, user=None):
+    """Ids rankeados filtrados por lo que `user` puede ver."""
+    ids = ranked_post_ids(query)
+    if not ids:
+        return []
+    visible = set(Post.objects.filter(pk__in=ids).visible_to(user).values_list('pk', flat=True))
+    return [pk for pk in ids if pk in visible]
@@ -0,0 +1,144 @@
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from my_wood_desk_back.images import renditions_ready, schedule_renditions
+from my_wood_desk_back.storage import track_file_references
+from profiles.cache import forget_profile_summaries
+from .counters import adjust_subject_counts, forget_subject_counts
+from .fragments import bump_card_versions
+from .models import Post, PostSubject, Subject
+from .search import index_posts
+
+# Conteo de referencias de los blobs de imagen (borrado al quedar huérfanos)
+track_file_references(Post, 'image')
+
+
+@receiver(post_save, sender=Post)
+def generate_post_image_renditions(sender, instance, raw=False, **kwargs):
+    # generate_renditions omite el trabajo si ya existen para ese fichero.
+    # raw (loaddata, importación en posts/transfer.py): lo hace quien carga
+    if instance.image and not raw:
+        schedule_renditions(instance.image)
+
+
+@receiver(renditions_ready)
+def refresh_cards_with_renditions(sender, name, **kwargs):
+    # Las tarjetas cacheadas antes de tener renditions muestran el original
+    bump_card_versions(list(Post.objects.filter(image=name).values_list('pk', flat=True)))
+
+
+# Índice de búsqueda full-text
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_posts([instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.subjects.through)
+def index_post_subjects(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            index_posts([instance.pk])
+        return
+    # Lado inverso (subject.posts.*): pk_set son posts
+    if action == 'pre_clear':
+        instance._cleared_post_ids = list(instance.posts.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        index_posts(getattr(instance, '_cleared_post_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        index_posts(pk_set)
+
+
+@receiver(post_save, sender=Subject)
+def reindex_subject_posts(sender, instance, created, **kwargs):
+    if not created:
+        post_ids = list(instance.posts.values_list('pk', flat=True))
+        index_posts(post_ids)
+        # el nombre de la asignatura aparece en las tarjetas cacheadas
+        bump_card_versions(post_ids)
+
+
+# Feed por asignatura: fecha desnormalizada y contadores
+
+@receiver(m2m_changed, sender=Post.subjects.through)
+def maintain_subject_links(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add':
+        # add()/set() insertan con bulk_create, sin pasar por save()
+        links = PostSubject.objects.filter(post_created_at__isnull=True)
+        links = links.filter(subject=instance, post_id__in=pk_set) if reverse else links.filter(post=instance, subject_id__in=pk_set)
+        links.update(post_created_at=Subquery(Post.objects.filter(pk=OuterRef('post_id')).values('created_at')[:1]))
+
+    if not reverse:
+        if action == 'pre_clear':
+            instance._cleared_subject_ids = list(instance.subjects.values_list('pk', flat=True))
+        elif instance.is_public and action in ('post_add', 'post_remove'):
+            adjust_subject_counts(pk_set, 1 if action == 'post_add' else -1)
+        elif instance.is_public and action == 'post_clear':
+            adjust_subject_counts(getattr(instance, '_cleared_subject_ids', []), -1)
+    elif action in ('post_add', 'post_remove'):
+        public = Post.objects.filter(pk__in=pk_set, audience=Post.AUDIENCE_PUBLIC).count()
+        adjust_subject_counts([instance.pk], public if action == 'post_add' else -public)
+    elif action == 'post_clear':
+        forget_subject_counts([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+def refresh_subject_counts(sender, instance, created, **kwargs):
+    # audience puede haber cambiado: recalcular en la próxima lectura
+    if not created:
+        forget_subject_counts(instance.subjects.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Post)
+def discount_deleted_post(sender, instance, **kwargs):
+    # El CASCADE sobre la tabla intermedia no emite m2m_changed
+    if instance.is_public:
+        adjust_subject_counts(instance.subjects.values_list('pk', flat=True), -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def forget_author_summary(sender, instance, raw=False, **kwargs):
+    # El resumen del perfil cuenta los posts públicos del autor
+    if not raw:
+        forget_profile_summaries([instance.user_id])
+
+
+# Versiones de las tarjetas cacheadas (posts/fragments.py)
+
+def _card_invalidator(reverse_accessor):
+    def handler(sender, instance, action, reverse, pk_set, **kwargs):
+        if not reverse:
+            if action in ('post_add', 'post_remove', 'post_clear'):
+                bump_card_versions([instance.pk])
+        elif action == 'pre_clear':
+            # user.liked_posts.clear(), subject.posts.clear()...: guardar los posts afectados
+            instance._card_cleared_ids = list(getattr(instance, reverse_accessor).values_list('pk', flat=True))
+        elif action == 'post_clear':
+            bump_card_versions(getattr(instance, '_card_cleared_ids', []))
+        elif action in ('post_add', 'post_remove'):
+            bump_card_versions(pk_set)
+    return handler
+
+
+CARD_AUTHOR_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_author_cards(sender, instance, created, update_fields=None, **kwargs):
+    # La tarjeta muestra el nombre del autor; los logins sólo guardan last_login
+    if created or (update_fields is not None and not CARD_AUTHOR_FIELDS & set(update_fields)):
+        return
+    bump_card_versions(list(Post.objects.filter(user=instance).values_list('pk', flat=True)))
+
+
+for _relation, _accessor in ((Post.likes, 'liked_posts'), (Post.saved_by, 'saved_posts'), (Post.subjects, 'posts')):
+    m2m_changed.connect(
+        _card_invalidator(_accessor),
+        sender=_relation.through,
+        weak=False,
+        dispatch_uid=f'posts.card_versions.{_accessor}',
+    )
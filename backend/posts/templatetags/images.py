@@ -0,0 +1,30 @@
+from django import template
+
+from my_wood_desk_back import images
+
+register = template.Library()
+
+
+@register.inclusion_tag('general/_includes/_picture.html')
+def picture(fieldfile, rendition='feed', sizes='100vw', css_class='', alt='', width=None, height=None):
+    """
+    Renderiza un <picture> con srcset WebP/JPEG si las renditions ya existen;
+    si todavía se están generando, cae al original.
+    """
+    ctx = {
+        'css_class': css_class,
+        'alt': alt,
+        'width': width,
+        'height': height,
+        'sizes': sizes,
+        'ready': False,
+        'src': fieldfile.url if fieldfile else '',
+    }
+    if images.has_renditions(fieldfile):
+        ctx.update({
+            'ready': True,
+            'src': images.rendition_url(fieldfile, rendition, 'jpg'),
+            'webp_srcset': images.srcset(fieldfile, 'webp'),
+            'jpg_srcset': images.srcset(fieldfile, 'jpg'),
+        })
+    return ctx
@@ -1,3 +1,58 @@
+import base64
+import datetime
+import json
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.utils import timezone
+
+from my_wood_desk_back.pagination import encode_cursor, keyset_paginate
+from .models import Post
+
+
+def raw_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+class KeysetPaginateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('autor', password='x')
+        start = timezone.now()
+        posts = Post.objects.bulk_create([Post(user=user, caption=f'post {i}') for i in range(5)])
+        # Dos posts con la misma fecha: el desempate es la pk
+        for i, post in enumerate(posts):
+            post.created_at = start - datetime.timedelta(minutes=min(i, 3))
+        Post.objects.bulk_update(posts, ['created_at'])
+        cls.expected = list(Post.objects.order_by('-created_at', '-pk'))
+
+    def test_pages_follow_ordering_without_gaps(self):
+        seen, cursor = [], None
+        while True:
+            page = keyset_paginate(Post.objects.all(), cursor, 2)
+            seen.extend(page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, self.expected)
+
+    def test_invalid_cursor_returns_first_page(self):
+        first = list(keyset_paginate(Post.objects.all(), None, 2))
+        cursors = [
+            'no-es-base64!',
+            raw_cursor({'a': 1}),
+            raw_cursor(['2024-01-01T00:00:00+00:00']),
+            raw_cursor(['notadate', 'x']),
+            raw_cursor([timezone.now().isoformat(), 'x']),
+            raw_cursor([None, 1]),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                page = keyset_paginate(Post.objects.all(), cursor, 2)
+                self.assertEqual(list(page), first)
 
-# Create your tests here.
+    def test_cursor_through_relation(self):
+        last = self.expected[1]
+        cursor = encode_cursor([last.user.date_joined, last.pk])
+        page = keyset_paginate(Post.objects.all(), cursor, 10, ordering=('-user__date_joined', '-pk'))
+        self.assertEqual([post.pk for post in page], sorted((post.pk for post in self.expected if post.pk < last.pk), reverse=True))
@@ -0,0 +1,258 @@
+"""
+Exportación e importación de posts en JSON Lines (un post por línea).
+
+Ambos sentidos trabajan por lotes para usar memoria constante: la
+exportación recorre la tabla con `iterator(chunk_size=...)` y la
+importación acumula `batch_size` líneas, las inserta con `bulk_create` y
+las descarta. Cada registro lleva autor (username), caption, visibilidad,
+fechas, asignaturas, contadores de likes/guardados (informativos) y la
+referencia a la imagen (nombre del blob); los ficheros de media se copian
+aparte.
+
+bulk_create no dispara señales, así que la importación hace a mano lo que
+harían los handlers de posts/signals.py: índice de búsqueda, referencias de
+blobs, fecha desnormalizada de PostSubject, contadores por asignatura,
+resúmenes de perfil y renditions. Los registros mal formados (JSON, autor,
+fechas, asignaturas) se cuentan como error y se omiten.
+"""
+import json
+import uuid
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_datetime
+
+from my_wood_desk_back.images import schedule_renditions
+from my_wood_desk_back.storage import acquire
+from profiles.cache import forget_profile_summaries
+from .counters import forget_subject_counts
+from .models import Post, PostSubject, SavedPost, Subject
+from .search import index_posts
+
+FORMAT_VERSION = 2
+DEFAULT_CHUNK_SIZE = 500
+MAX_ERRORS = 100
+
+
+def _count_subquery(through):
+    rows = (
+        through.objects.filter(post_id=OuterRef('pk'))
+        .order_by()
+        .values('post_id')
+        .annotate(n=Count('id'))
+        .values('n')
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+
+
+# Exportación
+
+def export_posts(queryset=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Genera una línea JSON por post, de más antiguo a más nuevo."""
+    queryset = Post.objects.all() if queryset is None else queryset
+    queryset = (
+        queryset.select_related('user')
+        .prefetch_related('subjects')
+        .annotate(
+            likes_total=_count_subquery(Post.likes.through),
+            saves_total=_count_subquery(SavedPost),
+        )
+        .order_by('pk')
+    )
+    # Con chunk_size, el prefetch se hace por bloque y no para toda la tabla
+    for post in queryset.iterator(chunk_size=chunk_size):
+        record = {
+            'v': FORMAT_VERSION,
+            'id': post.pk,
+            'user': post.user.username,
+            'caption': post.caption,
+            'image': post.image.name or None,
+            'audience': post.audience,
+            'created_at': post.created_at,
+            'updated_at': post.updated_at,
+            'subjects': [{'slug': s.slug, 'name': s.name} for s in post.subjects.all()],
+            'likes_count': post.likes_total,
+            'saves_count': post.saves_total,
+        }
+        yield json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+# Importación
+
+class ImportStats:
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        self.error_count = 0
+        # Sólo los primeros MAX_ERRORS mensajes: memoria constante
+        self.errors = []
+
+    def add_error(self, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(message)
+
+    def __str__(self):
+        return f'creados: {self.created}, omitidos: {self.skipped}, errores: {self.error_count}'
+
+
+def _parse_date(record, field):
+    value = record.get(field)
+    if not value:
+        return None
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise ValueError(f'fecha no válida en {field}: {value!r}')
+    return parsed
+
+
+def _parse(line_no, line, stats):
+    """Registro validado (fechas ya convertidas) o None si está mal formado."""
+    try:
+        record = json.loads(line)
+        if not isinstance(record, dict) or not record.get('user') or not isinstance(record['user'], str):
+            raise ValueError('falta el autor')
+        for field in ('caption', 'image'):
+            if not isinstance(record.get(field) or '', str):
+                raise ValueError(f'{field} debe ser texto')
+        record['created_at'] = _parse_date(record, 'created_at')
+        record['updated_at'] = _parse_date(record, 'updated_at')
+        subjects = record.get('subjects') or []
+        if not isinstance(subjects, list) or not all(
+            isinstance(s, dict) and s.get('slug') and isinstance(s['slug'], str) for s in subjects
+        ):
+            raise ValueError('asignaturas mal formadas (cada una necesita slug)')
+        record['subjects'] = subjects
+        return record
+    except ValueError as exc:
+        stats.add_error(f'línea {line_no}: {exc}')
+        return None
+
+
+def _resolve_subjects(records):
+    wanted = {}
+    for record in records:
+        for subject in record.get('subjects') or []:
+            wanted.setdefault(subject['slug'], subject.get('name') or subject['slug'])
+    if not wanted:
+        return {}
+
+    found = Subject.objects.in_bulk(list(wanted), field_name='slug')
+    missing = [Subject(slug=slug, name=name) for slug, name in wanted.items() if slug not in found]
+    if missing:
+        # ignore_conflicts: otra importación concurrente o un nombre ya usado con otro slug
+        Subject.objects.bulk_create(missing, ignore_conflicts=True)
+        found = Subject.objects.in_bulk(list(wanted), field_name='slug')
+        by_name = Subject.objects.filter(name__in=[wanted[s] for s in wanted if s not in found])
+        names = {subject.name: subject for subject in by_name}
+        for slug, name in wanted.items():
+            if slug not in found and name in names:
+                found[slug] = names[name]
+    return found
+
+
+def _insert_posts(posts):
+    if connection.features.can_return_rows_from_bulk_insert:
+        return Post.objects.bulk_create(posts)
+    # Sin RETURNING (MySQL) bulk_create no asigna pks: cada fila lleva una
+    # clave temporal y las pks se recuperan con una consulta por lote
+    for post in posts:
+        post.import_key = uuid.uuid4()
+    Post.objects.bulk_create(posts)
+    inserted = Post.objects.filter(import_key__in=[post.import_key for post in posts])
+    pks = dict(inserted.values_list('import_key', 'pk'))
+    inserted.update(import_key=None)
+    for post in posts:
+        post.pk = pks[post.import_key]
+        post.import_key = None
+    return posts
+
+
+def _audience(record):
+    audience = record.get('audience')
+    if audience in dict(Post.AUDIENCE_CHOICES):
+        return audience
+    # Formato v1: sólo is_public
+    return Post.AUDIENCE_PUBLIC if record.get('is_public', True) else Post.AUDIENCE_PRIVATE
+
+
+@transaction.atomic
+def _import_batch(records, stats):
+    users = get_user_model().objects.in_bulk(
+        {r['user'] for r in records}, field_name='username',
+    )
+    subjects = _resolve_subjects(records)
+
+    pending = []
+    for record in records:
+        user = users.get(record['user'])
+        if user is None:
+            stats.skipped += 1
+            stats.add_error(f'post {record.get("id")}: no existe el usuario {record["user"]!r}')
+            continue
+        post = Post(
+            user=user,
+            caption=record.get('caption') or '',
+            image=record.get('image') or '',
+            audience=_audience(record),
+        )
+        pending.append((post, record, record['created_at'], record['updated_at']))
+    if not pending:
+        return
+
+    posts = _insert_posts([post for post, *_ in pending])
+
+    # auto_now/auto_now_add pisan las fechas al insertar: restaurar las originales
+    dated = []
+    for post, _record, created_at, updated_at in pending:
+        if created_at or updated_at:
+            post.created_at = created_at or post.created_at
+            post.updated_at = updated_at or created_at or post.updated_at
+            dated.append(post)
+    if dated:
+        Post.objects.bulk_update(dated, ['created_at', 'updated_at'])
+
+    links = []
+    for post, record, *_ in pending:
+        slugs = {s['slug'] for s in record['subjects']}
+        links.extend(
+            PostSubject(post=post, subject=subjects[slug], post_created_at=post.created_at)
+            for slug in slugs if slug in subjects
+        )
+    PostSubject.objects.bulk_create(links, ignore_conflicts=True)
+
+    index_posts([post.pk for post in posts])
+    forget_subject_counts({link.subject_id for link in links})
+    forget_profile_summaries({post.user_id for post in posts})
+
+    storage = Post._meta.get_field('image').storage
+    for name, count in Counter(post.image.name for post in posts if post.image).items():
+        acquire(name, storage, count=count)
+    for post in posts:
+        schedule_renditions(post.image)
+
+    stats.created += len(posts)
+
+
+def import_posts(lines, batch_size=DEFAULT_CHUNK_SIZE):
+    """Importa posts desde un iterable de líneas JSON; devuelve ImportStats."""
+    stats = ImportStats()
+    batch = []
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        record = _parse(line_no, line, stats)
+        if record is None:
+            stats.skipped += 1
+            continue
+        batch.append(record)
+        if len(batch) >= batch_size:
+            _import_batch(batch, stats)
+            batch = []
+    if batch:
+        _import_batch(batch, stats)
+    return stats
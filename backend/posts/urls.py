@@ -1,6 +1,7 @@
 from django.urls import path
 from .views import (
-    PostListView, PostDetailView, UserPostsView,
+    PostListView, PostDetailView, UserPostsView, PostSearchView, SubjectPostsView,
+    SavedPostsView,
     PostCreateView, PostUpdateView, PostDeleteView,
     ToggleLikeView, ToggleSaveView,
 )
@@ -10,7 +11,10 @@ app_name = "posts"
 urlpatterns = [
     path("", PostListView.as_view(), name="list"),
     path("create/", PostCreateView.as_view(), name="create"),
+    path("search/", PostSearchView.as_view(), name="search"),
+    path("saved/", SavedPostsView.as_view(), name="saved"),
     path("user/<str:username>/", UserPostsView.as_view(), name="user_posts"),
+    path("subject/<slug:slug>/", SubjectPostsView.as_view(), name="subject"),
     path("<int:pk>/", PostDetailView.as_view(), name="detail"),
     path("<int:pk>/edit/", PostUpdateView.as_view(), name="update"),
     path("<int:pk>/delete/", PostDeleteView.as_view(), name="delete"),
@@ -1,47 +1,198 @@
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.paginator import InvalidPage
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy, reverse
 from django.views import View
 from django.views.generic import (
-    ListView, DetailView, CreateView, UpdateView, DeleteView
+    ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 )
 
-from .models import Post, Subject
+from my_wood_desk_back.pagination import keyset_paginate
+from profiles.cache import user_id_for_username
+from .counters import subject_post_counts
+from .engagement import record_event, register_view
+from .fragments import card_versions, prepare_post_cards
+from .mixins import AnonymousPageCacheMixin
+from .models import EngagementEvent, Post, PostSubject, SavedPost, Subject
+from .search import search_post_ids
 
 
-class PostListView(ListView):
+class PostListView(AnonymousPageCacheMixin, ListView):
     model = Post
     template_name = "posts/list.html"
     context_object_name = "posts"
     paginate_by = 12
 
+    def get_validators(self):
+        qs = self.get_queryset()
+        paginator = self.get_paginator(qs, self.paginate_by)
+        try:
+            page = paginator.page(self.request.GET.get(self.page_kwarg) or 1)
+        except InvalidPage:
+            return None
+        rows = list(qs.values_list('pk', 'updated_at')[page.start_index() - 1:page.end_index()])
+        if not rows:
+            return f'{paginator.count}|empty', None
+        versions = card_versions([pk for pk, _ in rows])
+        fingerprint = f'{paginator.count}|' + ','.join(
+            f'{pk}:{updated_at.timestamp()}:{versions[pk]}' for pk, updated_at in rows
+        )
+        return fingerprint, max(updated_at for _, updated_at in rows)
+
+    def get_queryset(self):
+        # Las asignaturas sólo se cargan para las tarjetas que no estén en caché
+        return Post.objects.visible_to(self.request.user).select_related('user')
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["posts"] = prepare_post_cards(ctx["posts"], self.request.user)
+        return ctx
+
+
+class PostSearchView(ListView):
+    """Búsqueda full-text rankeada sobre caption y asignaturas de los posts visibles."""
+    template_name = "posts/search.html"
+    context_object_name = "posts"
+    paginate_by = 12
+
     def get_queryset(self):
-        qs = Post.objects.select_related('user').prefetch_related('subjects')
-        # Show only public posts by default; allow owner to see their private posts on profile feed
-        return qs.filter(is_public=True)
+        # Se paginan sólo los ids; los posts se cargan para la página actual
+        return search_post_ids(self.request.GET.get("q", "").strip(), self.request.user)
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ids = list(ctx["posts"])
+        by_id = Post.objects.select_related('user').prefetch_related('subjects').in_bulk(ids)
+        ctx["posts"] = [by_id[pk] for pk in ids if pk in by_id]
+        ctx["query"] = self.request.GET.get("q", "").strip()
+        return ctx
+
+
+class SubjectPostsView(TemplateView):
+    """
+    Feed de una asignatura con paginación por cursor. Se recorre la tabla
+    intermedia por el índice (subject, -post_created_at, -post).
+    """
+    template_name = "posts/subject_feed.html"
+    paginate_by = 12
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        subject = get_object_or_404(Subject, slug=self.kwargs["slug"])
+        links = (
+            PostSubject.objects.filter(subject=subject)
+            .filter(Post.visibility_q(self.request.user, prefix='post__'))
+            .select_related('post__user')
+        )
+        page = keyset_paginate(
+            links,
+            self.request.GET.get("cursor"),
+            self.paginate_by,
+            ordering=('-post_created_at', '-post_id'),
+        )
+        posts = prepare_post_cards([link.post for link in page], self.request.user)
+
+        ctx["subject"] = subject
+        ctx["posts"] = posts
+        ctx["page"] = page
+        ctx["posts_count"] = subject_post_counts([subject.pk])[subject.pk]
+        return ctx
 
 
-class PostDetailView(DetailView):
+class PostDetailView(AnonymousPageCacheMixin, DetailView):
     model = Post
     template_name = "posts/detail.html"
     context_object_name = "post"
 
+    def get_queryset(self):
+        return Post.objects.visible_to(self.request.user)
 
-class UserPostsView(ListView):
-    model = Post
-    template_name = "posts/user_posts.html"
-    context_object_name = "posts"
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            # Con 304 o página cacheada no hay self.object: el autor sale de get_validators
+            obj = getattr(self, "object", None)
+            author_id = obj.user_id if obj is not None else getattr(self, "_author_id", None)
+            if author_id is not None:
+                register_view(request, int(self.kwargs["pk"]), author_id)
+        return response
+
+    def get_validators(self):
+        row = (
+            Post.objects.filter(pk=self.kwargs["pk"], audience=Post.AUDIENCE_PUBLIC)
+            .values_list('updated_at', 'user_id')
+            .first()
+        )
+        if row is None:
+            # inexistente o privado: respuesta normal, sin caché
+            return None
+        updated_at, self._author_id = row
+        version = card_versions([self.kwargs["pk"]])[self.kwargs["pk"]]
+        return f'{updated_at.timestamp()}:{version}', updated_at
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        user = self.request.user
+        ctx["viewer_liked"] = self.object.is_liked_by(user)
+        ctx["viewer_saved"] = self.object.is_saved_by(user)
+        return ctx
+
+
+class UserPostsView(TemplateView):
+    """
+    Posts de un usuario con paginación por cursor sobre el índice
+    (user, -created_at, -id). El username se resuelve a id una vez (caché)
+    y se aplica la visibilidad de cada post en la misma consulta.
+    """
+    template_name = "posts/user_post.html"
     paginate_by = 12
 
-    def get_queryset(self):
-        username = self.kwargs.get("username")
-        return Post.objects.filter(user__username=username).select_related('user').prefetch_related('subjects')
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        user_id = user_id_for_username(self.kwargs["username"])
+        if user_id is None:
+            raise Http404("Usuario no encontrado")
+
+        qs = Post.objects.filter(user_id=user_id).visible_to(self.request.user).select_related('user')
+        page = keyset_paginate(qs, self.request.GET.get("cursor"), self.paginate_by)
+
+        ctx["posts"] = prepare_post_cards(page, self.request.user)
+        ctx["page"] = page
+        return ctx
+
+
+class SavedPostsView(LoginRequiredMixin, TemplateView):
+    """
+    Posts guardados por el usuario, del más reciente al más antiguo, con
+    paginación por cursor sobre el índice (user, -saved_at, -id).
+    """
+    template_name = "posts/saved.html"
+    paginate_by = 12
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        user = self.request.user
+        links = (
+            SavedPost.objects.filter(user=user)
+            .filter(Post.visibility_q(user, prefix='post__'))
+            .select_related('post__user')
+        )
+        page = keyset_paginate(
+            links,
+            self.request.GET.get("cursor"),
+            self.paginate_by,
+            ordering=('-saved_at', '-id'),
+        )
+        ctx["posts"] = prepare_post_cards([link.post for link in page], user)
+        ctx["page"] = page
+        return ctx
 
 
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
-    fields = ("subjects", "image", "caption", "is_public")
+    fields = ("subjects", "image", "caption", "audience")
     template_name = "posts/form.html"
 
     def form_valid(self, form):
@@ -56,7 +207,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
 
 class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     model = Post
-    fields = ("subjects", "image", "caption", "is_public")
+    fields = ("subjects", "image", "caption", "audience")
     template_name = "posts/form.html"
 
     def test_func(self):
@@ -86,16 +237,21 @@ class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
 
 class ToggleLikeView(LoginRequiredMixin, View):
     def post(self, request, pk, *args, **kwargs):
-        post = get_object_or_404(Post, pk=pk)
+        post = get_object_or_404(Post.objects.visible_to(request.user), pk=pk)
         liked = post.toggle_like(request.user)
+        kind = EngagementEvent.KIND_LIKE if liked else EngagementEvent.KIND_UNLIKE
+        record_event(kind, post.pk, post.user_id, request.user)
         return redirect(request.META.get("HTTP_REFERER") or reverse("posts:detail", args=[pk]))
 
 
 class ToggleSaveView(LoginRequiredMixin, View):
     def post(self, request, pk, *args, **kwargs):
-        post = get_object_or_404(Post, pk=pk)
+        post = get_object_or_404(Post.objects.visible_to(request.user), pk=pk)
         if post.is_saved_by(request.user):
             post.unsave_for(request.user)
+            kind = EngagementEvent.KIND_UNSAVE
         else:
             post.save_for(request.user)
+            kind = EngagementEvent.KIND_SAVE
+        record_event(kind, post.pk, post.user_id, request.user)
         return redirect(request.META.get("HTTP_REFERER") or reverse("posts:detail", args=[pk]))
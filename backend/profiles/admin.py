@@ -1,27 +1,20 @@
 from django.contrib import admin
-from profiles.models import UserProfile, FriendRequest
+from profiles.models import UserProfile, FriendRequest, PeopleSuggestion
 
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
-    list_display = ('user', 'get_email', 'bio', 'get_friends_count', 'get_followers_count')
+    list_display = ('user', 'get_email', 'bio', 'friends_count', 'followers_count', 'following_count')
+    list_select_related = ('user',)
     list_filter = ('user__is_active', 'user__date_joined')
     search_fields = ('user__username', 'user__email', 'bio')
     filter_horizontal = ('friends', 'following')
-    readonly_fields = ('get_friends_count', 'get_followers_count')
+    readonly_fields = ('friends_count', 'followers_count', 'following_count')
 
     def get_email(self, obj):
         return obj.user.email
     get_email.short_description = 'Email'
 
-    def get_friends_count(self, obj):
-        return obj.friends.count()
-    get_friends_count.short_description = 'Amigos'
-
-    def get_followers_count(self, obj):
-        return obj.followers.count()
-    get_followers_count.short_description = 'Seguidores'
-
 
 @admin.register(FriendRequest)
 class FriendRequestAdmin(admin.ModelAdmin):
@@ -35,11 +28,17 @@ class FriendRequestAdmin(admin.ModelAdmin):
     actions = ['accept_requests', 'reject_requests']
 
     def accept_requests(self, request, queryset):
-        for friend_request in queryset.filter(status=FriendRequest.STATUS_PENDING):
-            friend_request.accept()
+        queryset.accept_all()
     accept_requests.short_description = "Aceptar solicitudes seleccionadas"
 
     def reject_requests(self, request, queryset):
-        for friend_request in queryset.filter(status=FriendRequest.STATUS_PENDING):
-            friend_request.reject()
+        queryset.reject_all()
     reject_requests.short_description = "Rechazar solicitudes seleccionadas"
+
+
+@admin.register(PeopleSuggestion)
+class PeopleSuggestionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'rank', 'suggested', 'score', 'mutual_friends', 'shared_subjects', 'computed_at')
+    search_fields = ('user__username', 'suggested__username')
+    raw_id_fields = ('user', 'suggested')
+    readonly_fields = ('computed_at',)
@@ -0,0 +1,19 @@
+"""
+Backend de autenticación que carga el usuario junto con su perfil.
+
+AuthenticationMiddleware llama a `get_user` una vez por petición; con el
+select_related, `request.user.profile` no cuesta otra consulta. Los
+usuarios sin perfil lo obtienen con `get_profile` al primer acceso.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class ProfileModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related('profile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
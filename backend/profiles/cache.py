@@ -0,0 +1,116 @@
+"""
+Cachés de consulta de usuarios.
+
+`user_id_for_username` resuelve el username de una URL a su id una sola vez
+y lo guarda en caché, para que las vistas filtren por `user_id` (índice) en
+lugar de hacer join con auth_user en cada página. Los receivers de
+profiles/models.py mantienen la entrada al cambiar o borrar el usuario.
+
+`following_user_ids` / `follower_user_ids` / `friend_user_ids` devuelven,
+por usuario, los ids de usuario (no de perfil) que sigue, que le siguen y
+de sus amigos como frozenset: las comprobaciones de pertenencia de
+UserProfile son O(1) y la visibilidad de posts los usa dentro de un
+`user_id IN (...)`. Se invalidan desde m2m_changed (profiles/models.py).
+
+`profile_summary` guarda los contadores del perfil (amigos, seguidores y
+siguiendo vienen de los campos de UserProfile; posts públicos) y una vista
+previa acotada de amigos; se borra al cambiar relaciones o posts del usuario.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+USERNAME_TIMEOUT = 60 * 60 * 24
+RELATIONS_TIMEOUT = 60 * 60
+SUMMARY_TIMEOUT = 60 * 60
+FRIENDS_PREVIEW = 5
+
+
+def _username_key(username):
+    return f'profiles:username:{username}:id'
+
+
+def user_id_for_username(username):
+    """Id del usuario con ese username, o None si no existe (no se cachea)."""
+    key = _username_key(username)
+    user_id = cache.get(key)
+    if user_id is None:
+        user_id = get_user_model().objects.filter(username=username).values_list('pk', flat=True).first()
+        if user_id is not None:
+            cache.set(key, user_id, USERNAME_TIMEOUT)
+    return user_id
+
+
+def remember_username(username, user_id):
+    cache.set(_username_key(username), user_id, USERNAME_TIMEOUT)
+
+
+def forget_username(username):
+    cache.delete(_username_key(username))
+
+
+def _relation_key(user_id, relation):
+    return f'profiles:{user_id}:{relation}'
+
+
+def _relation_ids(user_id, relation, lookup):
+    key = _relation_key(user_id, relation)
+    ids = cache.get(key)
+    if ids is None:
+        from .models import UserProfile
+
+        ids = frozenset(UserProfile.objects.filter(**{lookup: user_id}).values_list('user_id', flat=True))
+        cache.set(key, ids, RELATIONS_TIMEOUT)
+    return ids
+
+
+def following_user_ids(user_id):
+    """Ids de los usuarios a los que sigue `user_id`."""
+    return _relation_ids(user_id, 'following', 'followers__user_id')
+
+
+def follower_user_ids(user_id):
+    """Ids de los usuarios que siguen a `user_id`."""
+    return _relation_ids(user_id, 'followers', 'following__user_id')
+
+
+def friend_user_ids(user_id):
+    """Ids de los amigos de `user_id`."""
+    return _relation_ids(user_id, 'friends', 'friends__user_id')
+
+
+def forget_relations(user_ids, relation):
+    cache.delete_many([_relation_key(pk, relation) for pk in user_ids])
+
+
+def _summary_key(user_id):
+    return f'profiles:{user_id}:summary'
+
+
+def profile_summary(profile):
+    """Contadores y vista previa de amigos del perfil (cacheado)."""
+    key = _summary_key(profile.user_id)
+    summary = cache.get(key)
+    if summary is None:
+        from posts.models import Post
+
+        preview = (
+            get_user_model().objects.filter(profile__friends=profile.pk)
+            .order_by('username')
+            .values_list('username', 'first_name', 'last_name')[:FRIENDS_PREVIEW]
+        )
+        summary = {
+            'friends': profile.friends_count,
+            'followers': profile.followers_count,
+            'following': profile.following_count,
+            'posts': Post.objects.filter(user_id=profile.user_id, audience=Post.AUDIENCE_PUBLIC).count(),
+            'friends_preview': [
+                {'username': username, 'name': f'{first} {last}'.strip()}
+                for username, first, last in preview
+            ],
+        }
+        cache.set(key, summary, SUMMARY_TIMEOUT)
+    return summary
+
+
+def forget_profile_summaries(user_ids):
+    cache.delete_many([_summary_key(pk) for pk in user_ids])
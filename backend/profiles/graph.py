@@ -0,0 +1,246 @@
+"""
+Grafo social (amistades y seguimiento) en memoria del proceso.
+
+Cada relación se guarda en formato CSR con arrays de enteros: los vecinos
+del nodo i son `indices[indptr[i]:indptr[i + 1]]`, ordenados, y los nodos
+son ids de usuario. Ocupa unos 8 bytes por arista y responde amigos en
+común, grado y distancia (BFS) sin consultas.
+
+Los cambios de este proceso llegan desde los receptores m2m_changed (y
+desde las altas/aceptaciones en bloque) con `record_edges`: se aplican
+sobre una capa de cambios encima del CSR, que se compacta al crecer, y
+suben una versión compartida en la caché. Si otro proceso cambió el
+grafo, o la foto supera SOCIAL_GRAPH_MAX_AGE segundos, se reconstruye
+desde la base de datos (una consulta por relación) en un hilo aparte,
+sirviendo mientras tanto la foto anterior; sólo el primer acceso del
+proceso espera a la carga.
+"""
+import logging
+import threading
+import time
+from array import array
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'profiles:graph:version'
+COMPACT_AFTER = 1000
+
+_EMPTY = memoryview(array('q'))
+
+
+class CSRGraph:
+    """Grafo dirigido de ids de usuario con capa de cambios incremental."""
+
+    def __init__(self, edges=()):
+        self._load(sorted(set(edges)))
+
+    def _load(self, edges):
+        nodes = sorted({a for a, _ in edges})
+        index = {user_id: i for i, user_id in enumerate(nodes)}
+        indptr = array('q', [0]) * (len(nodes) + 1)
+        indices = array('q', (b for _, b in edges))
+        for a, _ in edges:
+            indptr[index[a] + 1] += 1
+        for i in range(len(nodes)):
+            indptr[i + 1] += indptr[i]
+        # Una sola asignación: los lectores de otros hilos ven el CSR viejo o el nuevo
+        self._csr = index, indptr, memoryview(indices)
+        self._added = defaultdict(set)
+        self._removed = defaultdict(set)
+        self._pending = 0
+
+    def _base(self, user_id):
+        index, indptr, view = self._csr
+        i = index.get(user_id)
+        if i is None:
+            return _EMPTY
+        return view[indptr[i]:indptr[i + 1]]
+
+    def _changed(self, user_id):
+        return user_id in self._added or user_id in self._removed
+
+    def neighbors(self, user_id):
+        """Vecinos de `user_id` (iterable de ids)."""
+        base = self._base(user_id)
+        if not self._changed(user_id):
+            return base
+        return (set(base) - self._removed.get(user_id, set())) | self._added.get(user_id, set())
+
+    def degree(self, user_id):
+        return len(self.neighbors(user_id))
+
+    def apply(self, edges, added):
+        """Añade o quita aristas (a, b) sin reconstruir el CSR."""
+        for a, b in edges:
+            if added:
+                self._removed[a].discard(b)
+                self._added[a].add(b)
+            else:
+                self._added[a].discard(b)
+                self._removed[a].add(b)
+            self._pending += 1
+        if self._pending > COMPACT_AFTER:
+            self.compact()
+
+    def compact(self):
+        """Funde la capa de cambios en un CSR nuevo."""
+        self._load(sorted(self.edges()))
+
+    def edges(self):
+        nodes = set(self._csr[0]) | set(self._added)
+        return [(a, b) for a in nodes for b in self.neighbors(a)]
+
+
+class SocialGraph:
+    def __init__(self, friends=(), following=(), version=None):
+        following = list(following)
+        self.friends = CSRGraph(friends)
+        self.following = CSRGraph(following)
+        self.followers = CSRGraph((b, a) for a, b in following)
+        self.version = version
+        self.built_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, version=None):
+        from .models import UserProfile
+
+        def rows(through):
+            return through.objects.values_list('from_userprofile__user_id', 'to_userprofile__user_id').iterator()
+
+        # friends es simétrica: la tabla ya tiene las dos direcciones
+        return cls(
+            friends=rows(UserProfile.friends.through),
+            following=rows(UserProfile.following.through),
+            version=version,
+        )
+
+    # Consultas
+
+    def mutual_friends(self, a, b):
+        """Ids ordenados de los amigos que tienen en común `a` y `b`."""
+        mine, theirs = self.friends.neighbors(a), self.friends.neighbors(b)
+        if len(mine) > len(theirs):
+            mine, theirs = theirs, mine
+        return sorted(set(mine).intersection(theirs))
+
+    def degree(self, user_id, relation='friends'):
+        return getattr(self, relation).degree(user_id)
+
+    def distance(self, a, b, max_depth=4):
+        """Saltos de amistad entre `a` y `b` (BFS bidireccional), o None si hay más de `max_depth`."""
+        if a == b:
+            return 0
+        seen = {a: 0}, {b: 0}
+        frontiers = [a], [b]
+        for depth in range(1, max_depth + 1):
+            # Expandir el lado con la frontera más pequeña
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            mine, other = seen[side], seen[1 - side]
+            level = mine[frontiers[side][0]] + 1
+            nxt = []
+            for node in frontiers[side]:
+                for neighbor in self.friends.neighbors(node):
+                    if neighbor in other:
+                        return level + other[neighbor]
+                    if neighbor not in mine:
+                        mine[neighbor] = level
+                        nxt.append(neighbor)
+            if not nxt:
+                return None
+            frontiers = (nxt, frontiers[1]) if side == 0 else (frontiers[0], nxt)
+        return None
+
+    # Cambios
+
+    def apply(self, relation, pairs, added):
+        with self.lock:
+            if relation == 'friends':
+                self.friends.apply([*pairs, *((b, a) for a, b in pairs)], added)
+            else:
+                self.following.apply(pairs, added)
+                self.followers.apply([(b, a) for a, b in pairs], added)
+
+
+_graph = None
+_graph_lock = threading.Lock()
+_refreshing = False
+_refreshing_lock = threading.Lock()
+
+
+def _shared_version():
+    return cache.get_or_set(VERSION_KEY, 0, None)
+
+
+def _is_stale(graph, version):
+    max_age = getattr(settings, 'SOCIAL_GRAPH_MAX_AGE', 300)
+    return graph is None or graph.version != version or time.monotonic() - graph.built_at > max_age
+
+
+def _refresh():
+    """Reconstruye la foto si sigue desfasada; los hilos que esperaban no repiten la carga."""
+    global _graph
+    with _graph_lock:
+        # La versión se lee antes de cargar: un cambio durante la carga la deja desfasada
+        version = _shared_version()
+        if _is_stale(_graph, version):
+            _graph = SocialGraph.load(version)
+        return _graph
+
+
+def _refresh_in_background():
+    global _refreshing
+    try:
+        _refresh()
+    except Exception:
+        logger.exception('No se pudo reconstruir el grafo social')
+    finally:
+        _refreshing = False
+        # Conexiones propias de este hilo
+        connections.close_all()
+
+
+def get_graph():
+    """Grafo del proceso; si está desfasado se sirve igual y se reconstruye en segundo plano."""
+    global _refreshing
+    graph = _graph
+    if not _is_stale(graph, _shared_version()):
+        return graph
+    if graph is None:
+        return _refresh()
+    with _refreshing_lock:
+        if _refreshing:
+            return graph
+        _refreshing = True
+    threading.Thread(target=_refresh_in_background, name='social-graph', daemon=True).start()
+    return graph
+
+
+def record_edges(relation, pairs, added):
+    """
+    Registra aristas (user_id, user_id) añadidas o quitadas en 'friends' o
+    'following' (seguidor, seguido). Se aplican en la foto de este proceso
+    y se sube la versión compartida para que los demás reconstruyan.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return
+
+    def publish():
+        _shared_version()
+        try:
+            version = cache.incr(VERSION_KEY)
+        except ValueError:
+            return
+        graph = _graph
+        if graph is not None and graph.version == version - 1:
+            graph.apply(relation, pairs, added)
+            graph.version = version
+
+    # Sólo si la transacción llega a confirmarse
+    transaction.on_commit(publish)
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from profiles.recommendations import DEFAULT_LIMIT, refresh_suggestions
+
+
+class Command(BaseCommand):
+    help = "Recalcula las sugerencias de \"personas que quizá conozcas\" (pensado para cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help='Sugerencias por usuario.')
+        parser.add_argument('--user', type=int, action='append', dest='users', help='Sólo para este id de usuario (repetible).')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = refresh_suggestions(user_ids=options['users'], limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Sugerencias guardadas: {written} en {time.perf_counter() - started:.2f}s'
+        ))
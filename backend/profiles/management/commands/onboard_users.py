@@ -0,0 +1,39 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from profiles.onboarding import DEFAULT_BATCH_SIZE, onboard_users
+
+
+class Command(BaseCommand):
+    help = "Da de alta usuarios en bloque desde un CSV (username,email,password,first_name,last_name[,classroom])."
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', nargs='?', default='-', help='Fichero CSV ("-" para stdin).')
+        parser.add_argument('--subject', action='append', dest='subjects', default=[], help='Asignatura de estudio inicial para cada usuario (repetible).')
+        parser.add_argument('--befriend', action='store_true', help='Hacer amigos a los miembros de cada clase.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=None, help='Procesos para hashear contraseñas (por defecto, uno por CPU).')
+
+    def handle(self, *args, **options):
+        source = sys.stdin if options['input'] == '-' else open(options['input'], encoding='utf-8', newline='')
+        started = time.perf_counter()
+        try:
+            stats = onboard_users(
+                source,
+                subjects=options['subjects'],
+                befriend=options['befriend'],
+                batch_size=options['batch_size'],
+                workers=options['workers'],
+            )
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        elapsed = time.perf_counter() - started
+        for error in stats.errors:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Alta terminada en {elapsed:.2f}s ({stats.created / elapsed if elapsed else 0:.0f} usuarios/s) — {stats}'
+        ))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from profiles.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Corrige los contadores de amigos/seguidores/siguiendo que se hayan desviado (pensado para cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Perfiles por lote.')
+        parser.add_argument('--dry-run', action='store_true', help='Sólo informar, sin escribir.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        batch_size = options['batch_size']
+        ids = list(UserProfile.objects.order_by('pk').values_list('pk', flat=True))
+        fixed = 0
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            drifted = list(
+                UserProfile.objects.filter(pk__in=chunk).with_counts()
+                .filter(
+                    ~Q(friends_count=F('friends_total'))
+                    | ~Q(followers_count=F('followers_total'))
+                    | ~Q(following_count=F('following_total'))
+                )
+                .values_list('pk', flat=True)
+            )
+            if drifted and not options['dry_run']:
+                UserProfile.objects.filter(pk__in=drifted).refresh_counters()
+            fixed += len(drifted)
+
+        verb = 'desviados' if options['dry_run'] else 'corregidos'
+        self.stdout.write(self.style.SUCCESS(
+            f'Perfiles revisados: {len(ids)}, {verb}: {fixed} en {time.perf_counter() - started:.2f}s'
+        ))
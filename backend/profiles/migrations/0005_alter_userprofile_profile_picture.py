@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:39
+
+import my_wood_desk_back.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_alter_userprofile_bio'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, storage=my_wood_desk_back.storage.get_content_addressed_storage, upload_to='profile_pictures/', verbose_name='profile picture'),
+        ),
+    ]
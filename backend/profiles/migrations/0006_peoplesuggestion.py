@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:56
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_alter_userprofile_profile_picture'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeopleSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='posición')),
+                ('score', models.FloatField(verbose_name='puntuación')),
+                ('mutual_friends', models.PositiveIntegerField(default=0, verbose_name='amigos en común')),
+                ('shared_subjects', models.PositiveIntegerField(default=0, verbose_name='asignaturas en común')),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='calculada')),
+                ('suggested', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='sugerido')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='people_suggestions', to=settings.AUTH_USER_MODEL, verbose_name='usuario')),
+            ],
+            options={
+                'verbose_name': 'sugerencia de amistad',
+                'verbose_name_plural': 'sugerencias de amistad',
+                'indexes': [models.Index(fields=['user', 'rank'], name='profiles_suggestion_rank_idx')],
+                'unique_together': {('user', 'suggested')},
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:57
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Copia del tokenizador de profiles/search.py: la migración no depende del código vivo
+_PART_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def normalize(text):
+    decomposed = unicodedata.normalize('NFKD', (text or '').casefold())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _add_prefixes(weights, word, exact_weight, prefix_weight):
+    word = word[:20]
+    for end in range(1, len(word) + 1):
+        token = word[:end]
+        weights[token] = max(weights.get(token, 0), exact_weight if end == len(word) else prefix_weight)
+
+
+def user_tokens(username, first_name='', last_name=''):
+    weights = {}
+    for part in _PART_RE.findall(normalize(f'{first_name} {last_name}')):
+        _add_prefixes(weights, part, 20, 8)
+    for part in _PART_RE.findall(normalize(username)):
+        _add_prefixes(weights, part, 20, 8)
+    _add_prefixes(weights, normalize(username), 100, 40)
+    return weights
+
+
+def index_existing_users(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserSearchToken = apps.get_model('profiles', 'UserSearchToken')
+    batch = []
+    users = User.objects.filter(is_active=True).values_list('pk', 'username', 'first_name', 'last_name')
+    for pk, username, first_name, last_name in users.iterator(chunk_size=500):
+        batch.extend(
+            UserSearchToken(user_id=pk, token=token, weight=weight)
+            for token, weight in user_tokens(username, first_name, last_name).items()
+        )
+        if len(batch) >= 1000:
+            UserSearchToken.objects.bulk_create(batch)
+            batch = []
+    UserSearchToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_peoplesuggestion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=20)),
+                ('weight', models.PositiveSmallIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'token de búsqueda de usuario',
+                'verbose_name_plural': 'tokens de búsqueda de usuario',
+                'indexes': [models.Index(fields=['token', 'user'], name='profiles_user_search_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_users, migrations.RunPython.noop),
+    ]
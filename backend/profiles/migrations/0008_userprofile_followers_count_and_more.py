@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    UserProfile = apps.get_model('profiles', 'UserProfile')
+    friendships = UserProfile.friends.through.objects
+    follows = UserProfile.following.through.objects
+
+    def count(queryset, column):
+        rows = queryset.order_by().values(column).annotate(n=Count('*')).values('n')
+        return Coalesce(Subquery(rows, output_field=models.IntegerField()), 0)
+
+    UserProfile.objects.update(
+        friends_count=count(friendships.filter(from_userprofile=OuterRef('pk')), 'from_userprofile'),
+        followers_count=count(follows.filter(to_userprofile=OuterRef('pk')), 'to_userprofile'),
+        following_count=count(follows.filter(from_userprofile=OuterRef('pk')), 'from_userprofile'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0007_usersearchtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='seguidores'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='siguiendo'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='friends_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='amigos'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0008_userprofile_followers_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(fields=['to_user', 'status', '-created_at'], name='profiles_fr_inbox_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:39
+
+from django.db import migrations
+from django.utils import timezone
+
+# Las sesiones guardan la ruta del backend que autenticó al usuario; las
+# abiertas con ModelBackend pasan a ProfileModelBackend para no cerrarse
+LEGACY_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+PROFILE_BACKEND = 'profiles.backends.ProfileModelBackend'
+
+
+def rewrite_session_backends(apps, schema_editor):
+    from django.contrib.auth import BACKEND_SESSION_KEY
+    from django.contrib.sessions.backends.db import SessionStore
+
+    Session = apps.get_model('sessions', 'Session')
+    store = SessionStore()
+    changed = []
+    sessions = Session.objects.using(schema_editor.connection.alias).filter(expire_date__gt=timezone.now())
+    for session in sessions.iterator(chunk_size=1000):
+        data = store.decode(session.session_data)
+        if data.get(BACKEND_SESSION_KEY) == LEGACY_BACKEND:
+            data[BACKEND_SESSION_KEY] = PROFILE_BACKEND
+            session.session_data = store.encode(data)
+            changed.append(session)
+    Session.objects.using(schema_editor.connection.alias).bulk_update(changed, ['session_data'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0009_friendrequest_profiles_fr_inbox_idx'),
+        ('sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(rewrite_session_backends, migrations.RunPython.noop),
+    ]
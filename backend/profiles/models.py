@@ -4,12 +4,61 @@ from django.conf import settings
 from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
 from django.dispatch import receiver
 
+from my_wood_desk_back.images import schedule_renditions
+from my_wood_desk_back.storage import get_content_addressed_storage, track_file_references
+from study.leaderboard import forget_leaderboards
+from .graph import record_edges
+from .cache import (
+    forget_profile_summaries, forget_relations, forget_username, remember_username,
+    follower_user_ids, following_user_ids, friend_user_ids,
+)
+
 User = get_user_model()
 
 
+def _count_of(queryset, column):
+    return models.Subquery(
+        queryset.order_by().values(column).annotate(n=models.Count('*')).values('n'),
+        output_field=models.IntegerField(),
+    )
+
+
+def _relation_counts():
+    """{contador: subconsulta COUNT sobre las tablas de amigos/seguimiento}."""
+    friendships = UserProfile.friends.through.objects
+    follows = UserProfile.following.through.objects
+    return {
+        'friends_count': Coalesce(_count_of(
+            friendships.filter(from_userprofile=models.OuterRef('pk')), 'from_userprofile'), 0),
+        'followers_count': Coalesce(_count_of(
+            follows.filter(to_userprofile=models.OuterRef('pk')), 'to_userprofile'), 0),
+        'following_count': Coalesce(_count_of(
+            follows.filter(from_userprofile=models.OuterRef('pk')), 'from_userprofile'), 0),
+    }
+
+
+class UserProfileQuerySet(models.QuerySet):
+    def with_counts(self):
+        """Anota los conteos reales (*_total) calculados desde las tablas M2M."""
+        from posts.models import Post
+
+        actual = {name.replace('_count', '_total'): expr for name, expr in _relation_counts().items()}
+        return self.annotate(
+            **actual,
+            posts_total=Coalesce(_count_of(
+                Post.objects.filter(user=models.OuterRef('user'), audience=Post.AUDIENCE_PUBLIC), 'user'), 0),
+        )
+
+    def refresh_counters(self, fields=None):
+        """Recalcula los contadores guardados con un único UPDATE."""
+        counts = _relation_counts()
+        return self.update(**{name: counts[name] for name in (fields or counts)})
+
+
 class UserProfile(models.Model):
     """Perfil de usuario: relación 1:1, amigos y seguimiento."""
     user = models.OneToOneField(
@@ -21,6 +70,7 @@ class UserProfile(models.Model):
     profile_picture = models.ImageField(
         _('profile picture'),
         upload_to='profile_pictures/',
+        storage=get_content_addressed_storage,
         null=True,
         blank=True,
     )
@@ -46,6 +96,15 @@ class UserProfile(models.Model):
         verbose_name=_('siguiendo'),
     )
 
+    # Contadores guardados; los mantienen los receptores m2m_changed de
+    # abajo (con UPDATE, save() no los escribe) y se reconcilian con
+    # `reconcile_profile_counters`
+    friends_count = models.PositiveIntegerField(_('amigos'), default=0, editable=False)
+    followers_count = models.PositiveIntegerField(_('seguidores'), default=0, editable=False)
+    following_count = models.PositiveIntegerField(_('siguiendo'), default=0, editable=False)
+
+    objects = UserProfileQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('perfil')
         verbose_name_plural = _('perfiles')
@@ -53,6 +112,21 @@ class UserProfile(models.Model):
     def __str__(self):
         return f'{self.user.username}'
 
+    COUNTER_FIELDS = frozenset({'friends_count', 'followers_count', 'following_count'})
+
+    def save(self, *args, **kwargs):
+        # Los contadores sólo se escriben con refresh_counters(): una instancia
+        # cargada antes de un cambio de amistad no debe pisarlos con lo viejo
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = {
+                    field.attname for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in self.COUNTER_FIELDS
+                }
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def send_friend_request(self, to_profile):
         """
         Crear solicitud si no existe, no es a sí mismo y no sois ya amigos.
@@ -88,11 +162,12 @@ class UserProfile(models.Model):
         Quitar amistad; dado que friends es symmetrical=True,
         basta remover en un lado.
         """
-        if other_profile in self.friends.all():
+        if self.is_friend(other_profile):
             self.friends.remove(other_profile)
 
+    # Pertenencia contra los conjuntos de ids cacheados (profiles/cache.py)
     def is_friend(self, other_profile):
-        return other_profile in self.friends.all()
+        return other_profile.user_id in friend_user_ids(self.user_id)
 
     # Follow utilities
     def follow(self, profile):
@@ -103,7 +178,54 @@ class UserProfile(models.Model):
         self.following.remove(profile)
 
     def is_following(self, profile):
-        return profile in self.following.all()
+        return profile.user_id in following_user_ids(self.user_id)
+
+    def is_followed_by(self, profile):
+        return profile.user_id in follower_user_ids(self.user_id)
+
+
+class FriendRequestQuerySet(models.QuerySet):
+    def pending(self):
+        return self.filter(status=FriendRequest.STATUS_PENDING)
+
+    @transaction.atomic
+    def accept_all(self):
+        """
+        Acepta las solicitudes pendientes del queryset: todas las amistades
+        (en los dos sentidos) con un bulk_create sobre la tabla intermedia.
+        La solicitud pendiente en sentido contrario, si la hay, también
+        queda aceptada.
+        """
+        pending = list(self.pending().select_for_update().values_list('pk', 'from_user_id', 'to_user_id'))
+        if not pending:
+            return 0
+        pairs = {(a, b) for _, a, b in pending} | {(b, a) for _, a, b in pending}
+        request_ids = {pk for pk, _, _ in pending}
+        reverse = (
+            FriendRequest.objects.pending().select_for_update()
+            .filter(from_user_id__in={b for _, _, b in pending}, to_user_id__in={a for _, a, _ in pending})
+            .values_list('pk', 'from_user_id', 'to_user_id')
+        )
+        request_ids.update(pk for pk, a, b in reverse if (a, b) in pairs)
+        Friendship = UserProfile.friends.through
+        Friendship.objects.bulk_create(
+            [Friendship(from_userprofile_id=a, to_userprofile_id=b) for a, b in pairs],
+            ignore_conflicts=True,
+        )
+        FriendRequest.objects.filter(pk__in=request_ids).update(
+            status=FriendRequest.STATUS_ACCEPTED, responded_at=timezone.now(),
+        )
+
+        # bulk_create no emite m2m_changed: contadores y cachés a mano
+        profile_ids = {a for a, _ in pairs}
+        UserProfile.objects.filter(pk__in=profile_ids).refresh_counters(['friends_count'])
+        user_of = _profile_user_ids(profile_ids)
+        record_edges('friends', [(user_of[a], user_of[b]) for a, b in pairs], added=True)
+        _forget_friend_caches(user_of.values())
+        return len(pending)
+
+    def reject_all(self):
+        return self.pending().update(status=FriendRequest.STATUS_REJECTED, responded_at=timezone.now())
 
 
 class FriendRequest(models.Model):
@@ -144,8 +266,14 @@ class FriendRequest(models.Model):
         verbose_name=_('respondida'),
     )
 
+    objects = FriendRequestQuerySet.as_manager()
+
     class Meta:
         unique_together = ('from_user', 'to_user')  # evitar duplicados
+        indexes = [
+            # Bandeja de entrada: pendientes recibidas, más recientes primero
+            models.Index(fields=['to_user', 'status', '-created_at'], name='profiles_fr_inbox_idx'),
+        ]
         verbose_name = _('solicitud de amistad')
         verbose_name_plural = _('solicitudes de amistad')
 
@@ -179,8 +307,194 @@ class FriendRequest(models.Model):
         return True
 
 
-# Señal para crear UserProfile automáticamente al crear un User
+class PeopleSuggestion(models.Model):
+    """
+    Sugerencia precalculada de "personas que quizá conozcas" para un
+    usuario (ver profiles/recommendations.py y el comando
+    compute_suggestions). El perfil lee las de su dueño en una consulta.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='people_suggestions',
+        verbose_name=_('usuario'),
+    )
+    suggested = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('sugerido'),
+    )
+    rank = models.PositiveSmallIntegerField(_('posición'))
+    score = models.FloatField(_('puntuación'))
+    mutual_friends = models.PositiveIntegerField(_('amigos en común'), default=0)
+    shared_subjects = models.PositiveIntegerField(_('asignaturas en común'), default=0)
+    computed_at = models.DateTimeField(_('calculada'), default=timezone.now)
+
+    class Meta:
+        unique_together = ('user', 'suggested')
+        indexes = [
+            models.Index(fields=['user', 'rank'], name='profiles_suggestion_rank_idx'),
+        ]
+        verbose_name = _('sugerencia de amistad')
+        verbose_name_plural = _('sugerencias de amistad')
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.suggested_id} ({self.score:.1f})'
+
+
+class UserSearchToken(models.Model):
+    """
+    Prefijo normalizado de un token del usuario (username, nombre,
+    apellidos) con su peso para el ranking. Ver profiles/search.py.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    token = models.CharField(max_length=20)
+    weight = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['token', 'user'], name='profiles_user_search_idx'),
+        ]
+        verbose_name = _('token de búsqueda de usuario')
+        verbose_name_plural = _('tokens de búsqueda de usuario')
+
+    def __str__(self):
+        return f'{self.token} -> {self.user_id}'
+
+
+def get_profile(user):
+    """
+    Perfil del usuario; se crea la primera vez que hace falta en lugar de
+    al dar de alta el usuario.
+    """
+    try:
+        return user.profile
+    except UserProfile.DoesNotExist:
+        profile, _ = UserProfile.objects.get_or_create(user=user)
+        user.profile = profile
+        return profile
+
+
+track_file_references(UserProfile, 'profile_picture')
+
+
+@receiver(post_save, sender=UserProfile)
+def generate_profile_picture_renditions(sender, instance, **kwargs):
+    if instance.profile_picture:
+        schedule_renditions(instance.profile_picture)
+
+
+# Caché username -> id (profiles/cache.py)
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_loaded_username(sender, instance, **kwargs):
+    instance._loaded_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_username_cache(sender, instance, **kwargs):
+    old = getattr(instance, '_loaded_username', None)
+    if old != instance.username:
+        if old:
+            forget_username(old)
+        remember_username(instance.username, instance.pk)
+        instance._loaded_username = instance.username
+
+
+# Índice de búsqueda de usuarios (profiles/search.py)
+SEARCH_FIELDS = {'username', 'first_name', 'last_name', 'is_active'}
+
+
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        UserProfile.objects.create(user=instance)
+def index_user_for_search(sender, instance, update_fields=None, **kwargs):
+    # El login guarda sólo last_login: no hace falta reindexar
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    from .search import index_users
+
+    index_users([instance.pk])
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_deleted_username(sender, instance, **kwargs):
+    forget_username(instance.username)
+
+
+# La vista previa de amigos del resumen de perfil muestra usuario y nombre
+SUMMARY_NAME_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_friend_summaries(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if created or raw or (update_fields is not None and not SUMMARY_NAME_FIELDS & set(update_fields)):
+        return
+    friend_ids = friend_user_ids(instance.pk)
+    if friend_ids:
+        transaction.on_commit(lambda: forget_profile_summaries(friend_ids))
+
+
+# Caché de ids seguidos / amigos (profiles/cache.py) y contadores guardados
+def _profile_user_ids(profile_ids):
+    return dict(UserProfile.objects.filter(pk__in=profile_ids).values_list('pk', 'user_id'))
+
+
+def _forget_friend_caches(user_ids):
+    # Tras el commit: antes, otra petición podría volver a cachear lo viejo
+    user_ids = list(user_ids)
+
+    def forget():
+        forget_relations(user_ids, 'friends')
+        forget_profile_summaries(user_ids)
+        forget_leaderboards(user_ids)
+
+    transaction.on_commit(forget)
+
+
+@receiver(m2m_changed, sender=UserProfile.following.through)
+def forget_following_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    # Seguir cambia "siguiendo" de un lado y "seguidores" del otro.
+    # reverse=True es profile.followers.*: instance es el seguido.
+    mine, theirs = ('followers', 'following') if reverse else ('following', 'followers')
+    if action == 'pre_clear':
+        related = instance.followers if reverse else instance.following
+        instance._cleared_follow_ids = dict(related.values_list('pk', 'user_id'))
+        return
+    if action == 'post_clear':
+        others = getattr(instance, '_cleared_follow_ids', {})
+    elif action in ('post_add', 'post_remove'):
+        others = _profile_user_ids(pk_set)
+    else:
+        return
+    UserProfile.objects.filter(pk=instance.pk).refresh_counters([f'{mine}_count'])
+    UserProfile.objects.filter(pk__in=others).refresh_counters([f'{theirs}_count'])
+    pairs = [(uid, instance.user_id) if reverse else (instance.user_id, uid) for uid in others.values()]
+    record_edges('following', pairs, added=action == 'post_add')
+    other_ids = list(others.values())
+
+    def forget():
+        forget_relations([instance.user_id], mine)
+        forget_relations(other_ids, theirs)
+        forget_profile_summaries([instance.user_id, *other_ids])
+
+    transaction.on_commit(forget)
+
+
+@receiver(m2m_changed, sender=UserProfile.friends.through)
+def forget_friends_cache(sender, instance, action, pk_set, **kwargs):
+    # Relación simétrica: cambian los dos lados
+    if action == 'pre_clear':
+        instance._cleared_friend_ids = dict(instance.friends.values_list('pk', 'user_id'))
+        return
+    if action == 'post_clear':
+        others = getattr(instance, '_cleared_friend_ids', {})
+    elif action in ('post_add', 'post_remove'):
+        others = _profile_user_ids(pk_set)
+    else:
+        return
+    # Django inserta las filas espejo después de post_add: para los otros
+    # perfiles se cuentan las filas que apuntan a ellos
+    UserProfile.objects.filter(pk=instance.pk).refresh_counters(['friends_count'])
+    UserProfile.objects.filter(pk__in=others).update(friends_count=Coalesce(_count_of(
+        UserProfile.friends.through.objects.filter(to_userprofile=models.OuterRef('pk')), 'to_userprofile'), 0))
+    record_edges('friends', [(instance.user_id, uid) for uid in others.values()], added=action == 'post_add')
+    _forget_friend_caches([instance.user_id, *others.values()])
@@ -0,0 +1,196 @@
+"""
+Alta masiva de usuarios (clases completas) desde CSV.
+
+Columnas: username, email, password, first_name, last_name y, opcional,
+classroom. El hash de las contraseñas es CPU puro y lo más lento del alta,
+así que se reparte en un pool de procesos. Después, por lotes y con una
+transacción cada uno, se insertan con `bulk_create` usuarios, perfiles,
+ajustes de pomodoro y asignaturas por defecto. bulk_create no dispara
+señales: el índice de búsqueda se actualiza a mano. Con `befriend` los
+miembros de cada clase quedan como amigos entre sí, también los que ya
+existían (p. ej. al repetir un alta que falló a medias).
+"""
+import csv
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from study.leaderboard import forget_leaderboards
+from study.models import PomodoroSettings, Subject as StudySubject
+from .cache import forget_profile_summaries, forget_relations
+from .graph import record_edges
+from .models import UserProfile
+from .search import index_users
+
+DEFAULT_BATCH_SIZE = 500
+FIELDS = ('username', 'email', 'password', 'first_name', 'last_name')
+
+
+class OnboardingStats:
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        self.friendships = 0
+        self.errors = []
+
+    def __str__(self):
+        return (
+            f'creados: {self.created}, omitidos: {self.skipped}, '
+            f'amistades: {self.friendships}, errores: {len(self.errors)}'
+        )
+
+
+def _init_worker():
+    # Con spawn (macOS/Windows) el proceso hijo arranca sin Django configurado
+    import django
+
+    django.setup()
+
+
+def _hash(raw):
+    # Sin contraseña: cuenta sin contraseña utilizable (reset por email)
+    return make_password(raw or None)
+
+
+def hash_passwords(passwords, workers=None):
+    passwords = list(passwords)
+    if workers == 1 or len(passwords) < 2:
+        return [_hash(raw) for raw in passwords]
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(_hash, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def read_rows(source, stats):
+    """
+    Filas válidas del CSV sin usernames repetidos, separadas en
+    (nuevas, de usuarios que ya existen).
+    """
+    User = get_user_model()
+    rows = []
+    seen = set()
+    for line_no, row in enumerate(csv.DictReader(source), start=2):
+        username = (row.get('username') or '').strip()
+        if not username:
+            stats.skipped += 1
+            stats.errors.append(f'línea {line_no}: falta el username')
+            continue
+        if username in seen:
+            stats.skipped += 1
+            stats.errors.append(f'línea {line_no}: username repetido {username!r}')
+            continue
+        seen.add(username)
+        rows.append({field: (row.get(field) or '').strip() for field in (*FIELDS, 'classroom')})
+
+    existing = set()
+    usernames = [row['username'] for row in rows]
+    for start in range(0, len(usernames), DEFAULT_BATCH_SIZE):
+        existing.update(
+            User.objects.filter(username__in=usernames[start:start + DEFAULT_BATCH_SIZE])
+            .values_list('username', flat=True)
+        )
+    for username in sorted(existing):
+        stats.skipped += 1
+        stats.errors.append(f'ya existe el usuario {username!r}')
+    return (
+        [row for row in rows if row['username'] not in existing],
+        [row for row in rows if row['username'] in existing],
+    )
+
+
+@transaction.atomic
+def _create_batch(rows, hashes, subjects):
+    User = get_user_model()
+    now = timezone.now()
+    users = User.objects.bulk_create([
+        User(
+            username=row['username'], email=row['email'], password=password,
+            first_name=row['first_name'], last_name=row['last_name'], date_joined=now,
+        )
+        for row, password in zip(rows, hashes)
+    ])
+    if any(user.pk is None for user in users):
+        # Sin RETURNING en el backend: recuperar los ids por username
+        users = list(User.objects.filter(username__in=[row['username'] for row in rows]))
+
+    profiles = UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+    PomodoroSettings.objects.bulk_create([PomodoroSettings(user=user) for user in users])
+    StudySubject.objects.bulk_create([
+        StudySubject(user=user, name=name) for user in users for name in subjects
+    ])
+    index_users([user.pk for user in users])
+    if any(profile.pk is None for profile in profiles):
+        profiles = list(UserProfile.objects.filter(user__in=users).select_related('user'))
+    return {profile.user.username: profile.pk for profile in profiles}
+
+
+def _existing_profile_ids(usernames):
+    profile_of = {}
+    usernames = list(usernames)
+    for start in range(0, len(usernames), DEFAULT_BATCH_SIZE):
+        profile_of.update(
+            UserProfile.objects.filter(user__username__in=usernames[start:start + DEFAULT_BATCH_SIZE])
+            .values_list('user__username', 'pk')
+        )
+    return profile_of
+
+
+def _befriend_classrooms(classrooms, stats):
+    Friendship = UserProfile.friends.through
+    pairs = [
+        (a, b)
+        for members in classrooms.values()
+        for x, y in combinations(sorted(members), 2)
+        for a, b in ((x, y), (y, x))
+    ]
+    profile_ids = {a for a, _ in pairs}
+    with transaction.atomic():
+        for start in range(0, len(pairs), DEFAULT_BATCH_SIZE * 10):
+            Friendship.objects.bulk_create(
+                [Friendship(from_userprofile_id=a, to_userprofile_id=b) for a, b in pairs[start:start + DEFAULT_BATCH_SIZE * 10]],
+                ignore_conflicts=True,
+            )
+        # bulk_create no emite m2m_changed: contadores y cachés a mano
+        UserProfile.objects.filter(pk__in=profile_ids).refresh_counters(['friends_count'])
+    user_of = dict(UserProfile.objects.filter(pk__in=profile_ids).values_list('pk', 'user_id'))
+    record_edges('friends', [(user_of[a], user_of[b]) for a, b in pairs], added=True)
+    user_ids = list(user_of.values())
+    forget_relations(user_ids, 'friends')
+    forget_profile_summaries(user_ids)
+    forget_leaderboards(user_ids)
+    stats.friendships += len(pairs) // 2
+
+
+def onboard_users(source, subjects=(), befriend=False, batch_size=DEFAULT_BATCH_SIZE, workers=None):
+    """Da de alta los usuarios del CSV `source`; devuelve OnboardingStats."""
+    stats = OnboardingStats()
+    rows, existing_rows = read_rows(source, stats)
+    hashes = hash_passwords((row['password'] for row in rows), workers=workers)
+
+    classrooms = defaultdict(set)
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        profile_of = _create_batch(chunk, hashes[start:start + batch_size], subjects)
+        stats.created += len(chunk)
+        for row in chunk:
+            if row['classroom']:
+                classrooms[row['classroom']].add(profile_of[row['username']])
+
+    if befriend:
+        # Los que ya existían siguen en su clase: una segunda pasada completa
+        # las amistades que la primera no llegó a crear
+        existing_rows = [row for row in existing_rows if row['classroom']]
+        profile_of = _existing_profile_ids(row['username'] for row in existing_rows)
+        for row in existing_rows:
+            if row['username'] in profile_of:
+                classrooms[row['classroom']].add(profile_of[row['username']])
+
+    if befriend and classrooms:
+        _befriend_classrooms(classrooms, stats)
+    return stats
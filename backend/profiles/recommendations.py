@@ -0,0 +1,146 @@
+"""
+"Personas que quizá conozcas".
+
+El cálculo carga una foto en memoria del grafo (amistades y seguidores
+en CSR, profiles/graph.py; solicitudes pendientes) y de los intereses de cada usuario (nombres de
+sus asignaturas de estudio y de las asignaturas de sus posts), con una
+consulta por tabla. Para cada usuario puntúa a los candidatos por amigos
+en común, asignaturas compartidas y si ya le sigue, y guarda los mejores
+en `PeopleSuggestion`. El comando `compute_suggestions` lo ejecuta
+periódicamente; el perfil sólo lee la tabla.
+"""
+import heapq
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import friend_user_ids
+from .graph import SocialGraph
+from .models import FriendRequest, PeopleSuggestion
+
+MUTUAL_FRIEND_WEIGHT = 3.0
+SHARED_SUBJECT_WEIGHT = 1.0
+FOLLOWS_YOU_WEIGHT = 2.0
+
+DEFAULT_LIMIT = 10
+BATCH_SIZE = 500
+
+# Asignaturas que comparte demasiada gente no dicen nada de nadie
+MAX_SUBJECT_AUDIENCE = 1000
+
+
+def _normalize(name):
+    return ' '.join((name or '').lower().split())
+
+
+class GraphSnapshot:
+    def __init__(self):
+        self.active = set()
+        self.graph = SocialGraph()
+        self.pending = defaultdict(set)
+        self.interests = defaultdict(set)
+        self.by_interest = defaultdict(set)
+
+    @classmethod
+    def load(cls):
+        from posts.models import PostSubject
+        from study.models import StudySession, Subject as StudySubject
+
+        snapshot = cls()
+        snapshot.active = set(get_user_model().objects.filter(is_active=True).values_list('pk', flat=True))
+        # Foto nueva, no la del proceso (que puede tener unos minutos)
+        snapshot.graph = SocialGraph.load()
+
+        rows = FriendRequest.objects.filter(status=FriendRequest.STATUS_PENDING).values_list(
+            'from_user__user_id', 'to_user__user_id',
+        )
+        for a, b in rows.iterator():
+            snapshot.pending[a].add(b)
+            snapshot.pending[b].add(a)
+
+        interest_rows = [
+            StudySubject.objects.filter(user__isnull=False).values_list('user_id', 'name'),
+            StudySession.objects.values_list('user_id', 'subject__name').distinct(),
+            PostSubject.objects.values_list('post__user_id', 'subject__name').distinct(),
+        ]
+        for rows in interest_rows:
+            for user_id, name in rows.iterator():
+                name = _normalize(name)
+                if name:
+                    snapshot.interests[user_id].add(name)
+                    snapshot.by_interest[name].add(user_id)
+        return snapshot
+
+    def suggestions_for(self, user_id, limit=DEFAULT_LIMIT):
+        """[(score, candidato, amigos en común, asignaturas en común)] ordenado."""
+        friends = self.graph.friends
+        mine = set(friends.neighbors(user_id))
+        excluded = mine | self.pending[user_id] | {user_id}
+
+        mutual = Counter()
+        for friend in mine:
+            for candidate in friends.neighbors(friend):
+                if candidate not in excluded:
+                    mutual[candidate] += 1
+
+        shared = Counter()
+        for name in self.interests[user_id]:
+            audience = self.by_interest[name]
+            if len(audience) > MAX_SUBJECT_AUDIENCE:
+                continue
+            for candidate in audience:
+                if candidate not in excluded:
+                    shared[candidate] += 1
+
+        followers = set(self.graph.followers.neighbors(user_id)) - excluded
+        candidates = (set(mutual) | set(shared) | followers) & self.active
+        scored = (
+            (
+                MUTUAL_FRIEND_WEIGHT * mutual[c]
+                + SHARED_SUBJECT_WEIGHT * shared[c]
+                + FOLLOWS_YOU_WEIGHT * (c in followers),
+                c, mutual[c], shared[c],
+            )
+            for c in candidates
+        )
+        # Desempate estable por id para que el resultado sea determinista
+        return heapq.nsmallest(limit, scored, key=lambda row: (-row[0], row[1]))
+
+
+def refresh_suggestions(user_ids=None, limit=DEFAULT_LIMIT, snapshot=None):
+    """Recalcula y guarda las sugerencias; devuelve cuántas filas se escribieron."""
+    snapshot = snapshot or GraphSnapshot.load()
+    if user_ids is None:
+        user_ids = sorted(snapshot.active)
+    user_ids = list(user_ids)
+    now = timezone.now()
+
+    written = 0
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        chunk = user_ids[start:start + BATCH_SIZE]
+        rows = [
+            PeopleSuggestion(
+                user_id=user_id, suggested_id=candidate, rank=rank, score=score,
+                mutual_friends=mutual, shared_subjects=shared, computed_at=now,
+            )
+            for user_id in chunk
+            for rank, (score, candidate, mutual, shared) in enumerate(snapshot.suggestions_for(user_id, limit), 1)
+        ]
+        with transaction.atomic():
+            PeopleSuggestion.objects.filter(user_id__in=chunk).delete()
+            PeopleSuggestion.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        written += len(rows)
+    return written
+
+
+def suggestions_for_user(user, limit=5):
+    """Sugerencias guardadas de `user` (una consulta), sin los que ya son amigos."""
+    rows = (
+        PeopleSuggestion.objects.filter(user=user)
+        .select_related('suggested__profile')
+        .order_by('rank')[:limit * 2]
+    )
+    friends = friend_user_ids(user.pk)
+    return [row for row in rows if row.suggested_id not in friends][:limit]
@@ -0,0 +1,150 @@
+"""
+Búsqueda de usuarios por prefijo.
+
+Cada usuario se indexa en `UserSearchToken` como los prefijos (edge
+n-grams) de sus tokens normalizados: username completo, sus partes, nombre
+y apellidos, en minúsculas y sin acentos. Buscar "jua per" es una consulta
+de igualdad sobre el índice (token) que exige que todos los términos
+coincidan y ordena por la suma de pesos (la consulta entera, p. ej.
+"juan_perez", se busca además como username sin ser obligatoria): username exacto > prefijo del
+username > palabra exacta > prefijo de palabra. Los amigos del usuario que
+busca suben en el ranking. Los ids rankeados de cada consulta se cachean
+unos segundos; el índice se mantiene desde profiles/models.py.
+"""
+import hashlib
+import re
+import unicodedata
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .cache import friend_user_ids
+
+MAX_PREFIX = 20
+MAX_TERMS = 4
+MAX_CANDIDATES = 200
+
+# Pesos de cada fila del índice
+WEIGHT_USERNAME_EXACT = 100
+WEIGHT_USERNAME_PREFIX = 40
+WEIGHT_WORD_EXACT = 20
+WEIGHT_WORD_PREFIX = 8
+FRIEND_BOOST = 30
+
+_PART_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def normalize(text):
+    """Minúsculas y sin acentos: 'Ándrés' -> 'andres'."""
+    decomposed = unicodedata.normalize('NFKD', (text or '').casefold())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(query):
+    return [t[:MAX_PREFIX] for t in _PART_RE.findall(normalize(query))][:MAX_TERMS]
+
+
+def username_term(query):
+    """La consulta entera normalizada si puede ser (prefijo de) un username con '_', '.', '-' o '@'."""
+    whole = normalize(query).strip()[:MAX_PREFIX]
+    if not whole or any(c.isspace() for c in whole) or whole in tokenize(query):
+        return None
+    return whole
+
+
+def _add_prefixes(weights, word, exact_weight, prefix_weight):
+    word = word[:MAX_PREFIX]
+    for end in range(1, len(word) + 1):
+        weight = exact_weight if end == len(word) else prefix_weight
+        token = word[:end]
+        weights[token] = max(weights.get(token, 0), weight)
+
+
+def user_tokens(username, first_name='', last_name=''):
+    """{token: peso} para un usuario; función pura (se usa en la migración)."""
+    weights = {}
+    for part in _PART_RE.findall(normalize(f'{first_name} {last_name}')):
+        _add_prefixes(weights, part, WEIGHT_WORD_EXACT, WEIGHT_WORD_PREFIX)
+    for part in _PART_RE.findall(normalize(username)):
+        _add_prefixes(weights, part, WEIGHT_WORD_EXACT, WEIGHT_WORD_PREFIX)
+    _add_prefixes(weights, normalize(username), WEIGHT_USERNAME_EXACT, WEIGHT_USERNAME_PREFIX)
+    return weights
+
+
+# Mantenimiento del índice
+
+def index_users(user_ids):
+    """(Re)indexa los usuarios indicados; los inactivos quedan fuera."""
+    from .models import UserSearchToken
+
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    users = get_user_model().objects.filter(pk__in=user_ids, is_active=True).values_list(
+        'pk', 'username', 'first_name', 'last_name',
+    )
+    rows = [
+        UserSearchToken(user_id=pk, token=token, weight=weight)
+        for pk, username, first_name, last_name in users
+        for token, weight in user_tokens(username, first_name, last_name).items()
+    ]
+    with transaction.atomic():
+        UserSearchToken.objects.filter(user_id__in=user_ids).delete()
+        UserSearchToken.objects.bulk_create(rows, batch_size=1000)
+
+
+# Consulta
+
+def ranked_user_ids(query):
+    """[(user_id, puntuación)] que coinciden con todos los términos (cacheado)."""
+    from .models import UserSearchToken
+
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return []
+    # Opcional: suma peso de username exacto/prefijo, pero no es obligatorio
+    whole = username_term(query)
+    lookup = terms + [whole] if whole else terms
+
+    key = 'profiles:search:' + hashlib.md5(' '.join(lookup).encode()).hexdigest()
+    ranked = cache.get(key)
+    if ranked is None:
+        rows = (
+            UserSearchToken.objects.filter(token__in=lookup)
+            .values('user_id')
+            .annotate(
+                matched=Count('token', filter=Q(token__in=terms), distinct=True),
+                score=Sum('weight'),
+            )
+            .filter(matched=len(terms))
+            .order_by('-score', 'user_id')[:MAX_CANDIDATES]
+        )
+        ranked = [(row['user_id'], row['score']) for row in rows]
+        cache.set(key, ranked, getattr(settings, 'USER_SEARCH_CACHE_TIMEOUT', 60))
+    return ranked
+
+
+def search_users(query, viewer=None, limit=50):
+    """Usuarios ordenados por relevancia para `viewer` (sin él mismo)."""
+    ranked = ranked_user_ids(query)
+    if not ranked:
+        return []
+    viewer_id = viewer.pk if viewer is not None and viewer.is_authenticated else None
+    friends = friend_user_ids(viewer_id) if viewer_id else frozenset()
+
+    scored = sorted(
+        ((score + (FRIEND_BOOST if pk in friends else 0), pk) for pk, score in ranked if pk != viewer_id),
+        key=lambda row: (-row[0], row[1]),
+    )[:limit]
+    ids = [pk for _, pk in scored]
+    users = get_user_model().objects.select_related('profile').in_bulk(ids)
+    results = []
+    for pk in ids:
+        user = users.get(pk)
+        if user is not None:
+            user.is_friend = pk in friends
+            results.append(user)
+    return results
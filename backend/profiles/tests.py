@@ -1,3 +1,66 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .graph import COMPACT_AFTER, CSRGraph, SocialGraph
+
+
+def symmetric(pairs):
+    return [*pairs, *((b, a) for a, b in pairs)]
+
+
+class CSRGraphTests(SimpleTestCase):
+    def test_neighbors_from_edges(self):
+        graph = CSRGraph([(1, 3), (1, 2), (2, 1), (1, 2)])
+        self.assertEqual(list(graph.neighbors(1)), [2, 3])
+        self.assertEqual(list(graph.neighbors(2)), [1])
+        self.assertEqual(list(graph.neighbors(9)), [])
+
+    def test_apply_adds_and_removes(self):
+        graph = CSRGraph([(1, 2), (1, 3)])
+        graph.apply([(1, 4), (5, 1)], added=True)
+        graph.apply([(1, 2)], added=False)
+        self.assertEqual(set(graph.neighbors(1)), {3, 4})
+        self.assertEqual(set(graph.neighbors(5)), {1})
+        self.assertEqual(graph.degree(1), 2)
+
+        # Quitar y volver a añadir deja la arista
+        graph.apply([(1, 3)], added=False)
+        graph.apply([(1, 3)], added=True)
+        self.assertEqual(set(graph.neighbors(1)), {3, 4})
+
+    def test_compact_keeps_edges(self):
+        graph = CSRGraph([(1, 2)])
+        graph.apply([(1, n) for n in range(3, COMPACT_AFTER + 10)], added=True)
+        self.assertEqual(graph._pending, 0)
+        self.assertEqual(list(graph.neighbors(1)), list(range(2, COMPACT_AFTER + 10)))
+        self.assertFalse(graph._changed(1))
+
+
+class SocialGraphDistanceTests(SimpleTestCase):
+    def setUp(self):
+        # 1 - 2 - 3 - 4 - 5, 6 - 7 aparte
+        self.graph = SocialGraph(friends=symmetric([(1, 2), (2, 3), (3, 4), (4, 5), (6, 7)]))
+
+    def test_distance(self):
+        self.assertEqual(self.graph.distance(1, 1), 0)
+        self.assertEqual(self.graph.distance(1, 2), 1)
+        self.assertEqual(self.graph.distance(1, 3), 2)
+        self.assertEqual(self.graph.distance(5, 1), 4)
+
+    def test_max_depth_and_disconnected(self):
+        self.assertIsNone(self.graph.distance(1, 5, max_depth=3))
+        self.assertIsNone(self.graph.distance(1, 6))
+        self.assertIsNone(self.graph.distance(1, 99))
+
+    def test_apply_updates_distance(self):
+        self.graph.apply('friends', [(1, 5)], added=True)
+        self.assertEqual(self.graph.distance(1, 5), 1)
+        self.assertEqual(self.graph.distance(2, 4), 2)
+        self.assertEqual(self.graph.mutual_friends(2, 5), [1])
+
+        self.graph.apply('friends', [(3, 4)], added=False)
+        self.assertEqual(self.graph.distance(3, 4), 4)
+
+    def test_following_does_not_count(self):
+        graph = SocialGraph(friends=symmetric([(1, 2)]), following=[(2, 3)])
+        self.assertIsNone(graph.distance(1, 3))
+        self.assertEqual(list(graph.followers.neighbors(3)), [2])
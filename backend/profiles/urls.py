@@ -8,7 +8,11 @@ app_name = "profiles"
 urlpatterns = [
     path("me/", views.MyProfileRedirectView.as_view(), name="me"),
     path("search/", views.UserSearchView.as_view(), name="search"),
+    path("autocomplete/", views.UserAutocompleteView.as_view(), name="autocomplete"),
     path('edit/', ProfileUpdateView.as_view(), name='edit'),
+    path('requests/', views.FriendRequestInboxView.as_view(), name='requests'),
+    path('requests/respond/', views.RespondFriendRequestsView.as_view(), name='respond_requests'),
     path('<str:username>/', ProfileDetailView.as_view(), name='detail'),
+    path('<str:username>/friends/', views.FriendListView.as_view(), name='friends'),
     path('<str:username>/friend-request/', SendFriendRequestView.as_view(), name='send_friend_request'),
 ]
@@ -4,19 +4,16 @@ from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
 from django.contrib import messages
 from django.contrib.auth import get_user_model
-from django.db.models import Q
-from .models import UserProfile
+from django.http import JsonResponse
+from .cache import following_user_ids, friend_user_ids, profile_summary
+from .graph import get_graph
+from .models import FriendRequest, UserProfile, get_profile
+from .recommendations import suggestions_for_user
+from .search import search_users
 from .forms import UserProfileForm
 
 User = get_user_model()
 
-# import simple y silencioso (si no existe, lo manejamos)
-try:
-    from .models import FriendRequest
-except Exception:
-    FriendRequest = None
-
-
 class ProfileDetailView(DetailView):
     model = User
     template_name = "profiles/detail.html"
@@ -25,39 +22,57 @@ class ProfileDetailView(DetailView):
     slug_url_kwarg = "username"
 
     def get_object(self, queryset=None):
-        return get_object_or_404(User, username=self.kwargs["username"])
+        # Perfil y usuario en una consulta; los contadores van en el resumen cacheado
+        self.profile = (
+            UserProfile.objects.select_related("user")
+            .filter(user__username=self.kwargs["username"]).first()
+        )
+        if self.profile is None:
+            self.profile = get_profile(get_object_or_404(User, username=self.kwargs["username"]))
+        return self.profile.user
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        user_obj = self.get_object()
-        profile = getattr(user_obj, "profile", None)
+        user_obj = self.object
+        profile = self.profile
 
         ctx["profile"] = profile
-        ctx["achievements"] = list(profile.achievements.all()) if profile and hasattr(profile, "achievements") else []
-        ctx["current_subjects"] = list(profile.current_subjects.all()) if profile and hasattr(profile, "current_subjects") else []
-
-        # Conteo de amigos sencillo: usar m2m profile.friends si existe,
-        # si no, intentar obtener desde FriendRequest (accepted=True).
-        friends = []
-        if profile and hasattr(profile, "friends"):
-            try:
-                friends = list(profile.friends.all())
-            except Exception:
-                friends = []
-        elif FriendRequest is not None:
-            try:
-                accepted = FriendRequest.objects.filter(
-                    Q(from_user=user_obj) | Q(to_user=user_obj),
-                    accepted=True
-                )
-                for fr in accepted:
-                    friends.append(fr.to_user if fr.from_user == user_obj else fr.from_user)
-            except Exception:
-                friends = []
-
-        ctx["friends_list"] = friends
-        ctx["friends_count"] = len(friends)
-        ctx["can_send_request"] = self.request.user.is_authenticated and self.request.user != user_obj
+        ctx["achievements"] = list(profile.achievements.all()) if hasattr(profile, "achievements") else []
+        ctx["current_subjects"] = list(profile.current_subjects.all()) if hasattr(profile, "current_subjects") else []
+
+        summary = profile_summary(profile)
+        ctx["friends_list"] = summary["friends_preview"]
+        ctx["friends_count"] = summary["friends"]
+        ctx["followers_count"] = summary["followers"]
+        ctx["following_count"] = summary["following"]
+        ctx["posts_count"] = summary["posts"]
+
+        viewer = self.request.user
+        ctx["is_friend"] = viewer.is_authenticated and viewer.pk in friend_user_ids(user_obj.pk)
+        ctx["is_following"] = viewer.is_authenticated and user_obj.pk in following_user_ids(viewer.pk)
+        ctx["can_send_request"] = viewer.is_authenticated and viewer != user_obj and not ctx["is_friend"]
+        if viewer.is_authenticated and viewer != user_obj:
+            # Grafo en memoria (profiles/graph.py): sin consultas
+            graph = get_graph()
+            ctx["mutual_friends_count"] = len(graph.mutual_friends(viewer.pk, user_obj.pk))
+            ctx["friend_distance"] = graph.distance(viewer.pk, user_obj.pk, max_depth=3)
+        # Sugerencias precalculadas (compute_suggestions), sólo en el perfil propio
+        ctx["suggestions"] = suggestions_for_user(viewer) if viewer == user_obj else []
+        return ctx
+
+
+class FriendListView(ListView):
+    template_name = "profiles/friends.html"
+    context_object_name = "friends"
+    paginate_by = 30
+
+    def get_queryset(self):
+        self.profile_user = get_object_or_404(User, username=self.kwargs["username"])
+        return User.objects.filter(profile__friends__user=self.profile_user).order_by("username")
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["profile_user"] = self.profile_user
         return ctx
 
 
@@ -67,38 +82,82 @@ class UserSearchView(LoginRequiredMixin, ListView):
     context_object_name = "results"
 
     def get_queryset(self):
-        q = self.request.GET.get("q", "").strip()
-        if not q:
-            return User.objects.none()
-        return User.objects.filter(
-            Q(username__icontains=q) | Q(first_name__icontains=q) | Q(last_name__icontains=q)
-        ).exclude(pk=self.request.user.pk)[:50]
+        # Índice de prefijos (profiles/search.py) en lugar de icontains sobre auth_user
+        return search_users(self.request.GET.get("q", "").strip(), self.request.user)
+
+
+class UserAutocompleteView(LoginRequiredMixin, View):
+    """Sugerencias JSON para el buscador de usuarios mientras se escribe."""
+    limit = 8
+
+    def get(self, request, *args, **kwargs):
+        users = search_users(request.GET.get("q", "").strip(), request.user, limit=self.limit)
+        return JsonResponse({"results": [
+            {
+                "username": u.username,
+                "name": u.get_full_name(),
+                "url": reverse("profiles:detail", args=[u.username]),
+                "is_friend": u.is_friend,
+            }
+            for u in users
+        ]})
 
 
 class SendFriendRequestView(LoginRequiredMixin, View):
     def post(self, request, username, *args, **kwargs):
-        target = get_object_or_404(User, username=username)
-        if target == request.user:
+        # FriendRequest relaciona perfiles, no usuarios
+        target = get_profile(get_object_or_404(User.objects.select_related("profile"), username=username))
+        mine = get_profile(request.user)
+        if target == mine:
             messages.error(request, "No puedes enviarte una solicitud a ti mismo.")
             return redirect(reverse("profiles:detail", args=[username]))
 
-        if FriendRequest is None:
-            messages.error(request, "Funcionalidad de friend request no disponible.")
-            return redirect(reverse("profiles:detail", args=[username]))
-
-        # Chequeo simple de duplicados y creación
-        if FriendRequest.objects.filter(from_user=request.user, to_user=target).exists():
-            messages.info(request, "Ya enviaste una solicitud a este usuario.")
-            return redirect(reverse("profiles:detail", args=[username]))
-
-        try:
-            FriendRequest.objects.create(from_user=request.user, to_user=target)
+        fr = mine.send_friend_request(target)
+        if fr is None:
+            messages.info(request, "Ya enviaste una solicitud a este usuario o ya sois amigos.")
+        elif fr.status == FriendRequest.STATUS_ACCEPTED:
+            # Había una solicitud suya pendiente: se aceptó
+            messages.success(request, "Ahora sois amigos.")
+        else:
             messages.success(request, "Solicitud enviada.")
-        except Exception:
-            messages.error(request, "No se pudo enviar la solicitud.")
         return redirect(reverse("profiles:detail", args=[username]))
 
 
+class FriendRequestInboxView(LoginRequiredMixin, ListView):
+    """Solicitudes de amistad pendientes recibidas."""
+    template_name = "profiles/requests.html"
+    context_object_name = "friend_requests"
+    paginate_by = 20
+
+    def get_queryset(self):
+        # Usa el índice (to_user, status, -created_at)
+        return (
+            FriendRequest.objects.pending()
+            .filter(to_user__user=self.request.user)
+            .select_related("from_user__user")
+            .order_by("-created_at")
+        )
+
+
+class RespondFriendRequestsView(LoginRequiredMixin, View):
+    """Acepta o rechaza en bloque las solicitudes marcadas (o todas)."""
+    def post(self, request, *args, **kwargs):
+        action = request.POST.get("action")
+        pending = FriendRequest.objects.filter(to_user__user=request.user)
+        if action == "accept_all":
+            action = "accept"
+        else:
+            pending = pending.filter(pk__in=[pk for pk in request.POST.getlist("ids") if pk.isdigit()])
+
+        if action == "accept":
+            count = pending.accept_all()
+            messages.success(request, f"Solicitudes aceptadas: {count}.")
+        elif action == "reject":
+            count = pending.reject_all()
+            messages.success(request, f"Solicitudes rechazadas: {count}.")
+        return redirect(reverse("profiles:requests"))
+
+
 class MyProfileRedirectView(LoginRequiredMixin, View):
     def get(self, request, *args, **kwargs):
         return redirect(reverse("profiles:detail", args=[request.user.username]))
@@ -111,7 +170,7 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
 
     def get_object(self, queryset=None):
         # editar el propio perfil
-        return UserProfile.objects.get(user=self.request.user)
+        return get_profile(self.request.user)
 
     def form_valid(self, form):
         messages.success(self.request, "Perfil actualizado.")
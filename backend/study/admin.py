@@ -1,13 +1,14 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
-from .models import Alarm, PomodoroSettings, PostIt, StudySession
+from .models import Alarm, PomodoroSettings, PostIt, StudyDayTotal, StudySession
 
 
 @admin.register(Alarm)
 class AlarmAdmin(admin.ModelAdmin):
-    list_display = ('name', 'user', 'time', 'get_days', 'is_active', 'created_at')
+    list_display = ('name', 'user', 'time', 'get_days', 'is_active', 'next_fire_at', 'created_at')
     list_filter = ('is_active', 'created_at')
     search_fields = ('name', 'user__username')
+    readonly_fields = ('next_fire_at',)
     ordering = ('time',)
 
     def get_days(self, obj):
@@ -96,3 +97,13 @@ class StudySessionAdmin(admin.ModelAdmin):
             f"Se finalizaron {active_sessions.count()} sesiones de estudio."
         )
     end_selected_sessions.short_description = _("Finalizar sesiones seleccionadas")
+
+
+@admin.register(StudyDayTotal)
+class StudyDayTotalAdmin(admin.ModelAdmin):
+    list_display = ('day', 'user', 'subject', 'seconds', 'sessions')
+    list_filter = ('day',)
+    search_fields = ('user__username', 'subject__name')
+    raw_id_fields = ('user', 'subject')
+    date_hierarchy = 'day'
+    ordering = ('-day',)
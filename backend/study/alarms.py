@@ -0,0 +1,141 @@
+"""
+Motor de alarmas: convierte las alarmas activas en notificaciones.
+
+Cada alarma guarda su próximo disparo en `next_fire_at` (indexado), que se
+recalcula al guardarla y cada vez que suena. Así las alarmas pendientes
+son un rango del índice (`next_fire_at <= ahora`) y nunca hace falta
+recorrer la tabla entera. Las horas son de la zona horaria del proyecto
+(TIME_ZONE); una alarma sin días no suena nunca.
+
+`AlarmScheduler` mantiene en un heap los disparos de los próximos minutos
+y duerme hasta el más cercano; lo lanza el comando `run_alarms`. Si el
+proceso estuvo parado, cada alarma atrasada suena una sola vez y pasa a
+su siguiente disparo futuro.
+"""
+import datetime
+import heapq
+import time
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from notifications.models import Notification
+from .models import Alarm
+
+ALARM_BATCH_SIZE = 1000
+DEFAULT_REFRESH = 60
+
+
+def next_fire_time(alarm_time, days, after, tz=None):
+    """Primer disparo estrictamente posterior a `after`, o None si no hay días."""
+    days = {day for day in days or () if isinstance(day, int) and 0 <= day <= 6}
+    if not days:
+        return None
+    tz = tz or timezone.get_current_timezone()
+    today = after.astimezone(tz).date()
+    for offset in range(8):
+        day = today + datetime.timedelta(days=offset)
+        if day.weekday() in days:
+            candidate = datetime.datetime.combine(day, alarm_time, tzinfo=tz)
+            if candidate > after:
+                return candidate
+    return None
+
+
+def _notification(alarm, content_type):
+    return Notification(
+        user_id=alarm.user_id,
+        notification_type=Notification.TYPE_ALARM,
+        title=alarm.name,
+        message=f'Alarma de las {alarm.time:%H:%M}',
+        priority=Notification.PRIORITY_HIGH,
+        content_type=content_type,
+        object_id=alarm.pk,
+    )
+
+
+def fire_due_alarms(now=None, batch_size=ALARM_BATCH_SIZE):
+    """
+    Crea las notificaciones de las alarmas con disparo <= `now`, por lotes,
+    y programa el siguiente disparo. Devuelve las alarmas disparadas.
+    """
+    now = now or timezone.now()
+    content_type = ContentType.objects.get_for_model(Alarm)
+    fired = []
+    while True:
+        with transaction.atomic():
+            # skip_locked: varios planificadores no disparan dos veces la misma alarma
+            batch = list(
+                Alarm.objects.select_for_update(skip_locked=True)
+                .filter(is_active=True, next_fire_at__lte=now)
+                .order_by('next_fire_at')[:batch_size]
+            )
+            if not batch:
+                break
+            Notification.objects.bulk_create([_notification(alarm, content_type) for alarm in batch])
+            for alarm in batch:
+                alarm.next_fire_at = next_fire_time(alarm.time, alarm.days, now)
+            Alarm.objects.bulk_update(batch, ['next_fire_at'])
+        fired.extend(batch)
+        if len(batch) < batch_size:
+            break
+    return fired
+
+
+def schedule_all(batch_size=ALARM_BATCH_SIZE):
+    """Recalcula `next_fire_at` de todas las alarmas (tras cambiar TIME_ZONE o con update() en bloque)."""
+    now = timezone.now()
+    changed = []
+    for alarm in Alarm.objects.only('pk', 'time', 'days', 'is_active', 'next_fire_at').iterator(chunk_size=batch_size):
+        fire_at = next_fire_time(alarm.time, alarm.days, now) if alarm.is_active else None
+        if fire_at != alarm.next_fire_at:
+            alarm.next_fire_at = fire_at
+            changed.append(alarm)
+        if len(changed) >= batch_size:
+            Alarm.objects.bulk_update(changed, ['next_fire_at'])
+            changed = []
+    Alarm.objects.bulk_update(changed, ['next_fire_at'])
+
+
+class AlarmScheduler:
+    """
+    Bucle de disparo. Cada `refresh` segundos carga en el heap los disparos
+    de los próximos 2 * `refresh` segundos (consulta por rango del índice),
+    así recoge las alarmas nuevas o editadas con, como mucho, ese retraso.
+    """
+
+    def __init__(self, refresh=DEFAULT_REFRESH, batch_size=ALARM_BATCH_SIZE, sleep=time.sleep):
+        self.refresh = datetime.timedelta(seconds=refresh)
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.heap = []
+        self.reload_at = None
+        self.horizon = None
+        self.fired = 0
+
+    def load(self, now):
+        self.horizon = now + 2 * self.refresh
+        rows = Alarm.objects.filter(is_active=True, next_fire_at__lte=self.horizon).values_list('next_fire_at', 'pk')
+        self.heap = list(rows.iterator(chunk_size=self.batch_size))
+        heapq.heapify(self.heap)
+        self.reload_at = now + self.refresh
+
+    def tick(self, now=None):
+        """Dispara lo pendiente; devuelve los segundos que se puede dormir."""
+        now = now or timezone.now()
+        if self.reload_at is None or now >= self.reload_at:
+            self.load(now)
+        if self.heap and self.heap[0][0] <= now:
+            while self.heap and self.heap[0][0] <= now:
+                heapq.heappop(self.heap)
+            for alarm in fire_due_alarms(now, self.batch_size):
+                self.fired += 1
+                if alarm.next_fire_at is not None and alarm.next_fire_at <= self.horizon:
+                    heapq.heappush(self.heap, (alarm.next_fire_at, alarm.pk))
+        wake = min(self.heap[0][0], self.reload_at) if self.heap else self.reload_at
+        return max((wake - now).total_seconds(), 0)
+
+    def run(self, until=None):
+        while until is None or timezone.now() < until:
+            self.sleep(self.tick())
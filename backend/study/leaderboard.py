@@ -0,0 +1,79 @@
+"""
+Clasificación de tiempo de estudio entre amigos (semana y mes en curso).
+
+Se calcula con una consulta agrupada sobre StudyDayTotal por periodo,
+limitada al usuario y sus amigos (ids cacheados de profiles/cache.py), y
+se guarda en caché por usuario. Al terminar o cambiar una sesión se borra
+la clasificación de su autor y de sus amigos (study/signals.py), y al
+hacerse o dejar de ser amigos la de ambos lados (profiles/models.py).
+"""
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from profiles.cache import friend_user_ids
+from .models import StudyDayTotal
+from .stats import format_seconds
+
+SCOPES = ('week', 'month')
+
+
+def period_start(scope, today=None):
+    today = today or timezone.localdate()
+    if scope == 'week':
+        return today - datetime.timedelta(days=today.weekday())
+    return today.replace(day=1)
+
+
+def _key(user_id, scope):
+    return f'study:leaderboard:{user_id}:{scope}'
+
+
+def _compute(user, scope, since):
+    ids = {user.pk, *friend_user_ids(user.pk)}
+    rows = (
+        StudyDayTotal.objects.filter(user_id__in=ids, day__gte=since, seconds__gt=0)
+        .values('user_id', 'user__username', 'user__first_name', 'user__last_name')
+        .annotate(total=Sum('seconds'))
+        .order_by('-total', 'user_id')
+    )
+    board = [
+        {
+            'user_id': row['user_id'],
+            'username': row['user__username'],
+            'name': f"{row['user__first_name']} {row['user__last_name']}".strip(),
+            'seconds': row['total'],
+            'label': format_seconds(row['total']),
+        }
+        for row in rows
+    ]
+    if not any(entry['user_id'] == user.pk for entry in board):
+        # El propio usuario aparece aunque no haya estudiado
+        board.append({
+            'user_id': user.pk, 'username': user.username, 'name': user.get_full_name(),
+            'seconds': 0, 'label': format_seconds(0),
+        })
+    for rank, entry in enumerate(board, 1):
+        entry['rank'] = rank
+    return {'since': since, 'entries': board}
+
+
+def friends_leaderboard(user, scope='week', limit=None):
+    """{'since', 'entries', 'me'}: clasificación de `user` y sus amigos en el periodo."""
+    since = period_start(scope)
+    key = _key(user.pk, scope)
+    cached = cache.get(key)
+    # La entrada de la semana/mes anterior no sirve aunque no haya caducado
+    if cached is None or cached['since'] != since:
+        cached = _compute(user, scope, since)
+        cache.set(key, cached, getattr(settings, 'STUDY_LEADERBOARD_TIMEOUT', 10 * 60))
+    entries = cached['entries']
+    me = next(entry for entry in entries if entry['user_id'] == user.pk)
+    return {'since': since, 'entries': entries[:limit] if limit else entries, 'me': me}
+
+
+def forget_leaderboards(user_ids):
+    cache.delete_many([_key(pk, scope) for pk in user_ids for scope in SCOPES])
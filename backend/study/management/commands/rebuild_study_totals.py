@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from study.stats import rebuild_day_totals
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los totales diarios de estudio desde las sesiones."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help='Sólo para este id de usuario (repetible).')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_day_totals(user_ids=options['users'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Totales diarios escritos: {written} en {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,36 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from study.alarms import ALARM_BATCH_SIZE, DEFAULT_REFRESH, AlarmScheduler, fire_due_alarms, schedule_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Dispara las alarmas como notificaciones. Por defecto se queda en marcha durmiendo "
+        "hasta el siguiente aviso; con --once dispara lo pendiente y termina (cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Disparar lo pendiente y salir.')
+        parser.add_argument('--reschedule', action='store_true', help='Recalcular antes el próximo aviso de todas las alarmas.')
+        parser.add_argument('--refresh', type=int, default=DEFAULT_REFRESH, help='Segundos entre recargas de las alarmas próximas.')
+        parser.add_argument('--batch-size', type=int, default=ALARM_BATCH_SIZE)
+        parser.add_argument('--for', type=int, dest='seconds', help='Salir tras estos segundos.')
+
+    def handle(self, *args, **options):
+        if options['reschedule']:
+            schedule_all(options['batch_size'])
+        if options['once']:
+            fired = fire_due_alarms(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Alarmas disparadas: {len(fired)}'))
+            return
+
+        scheduler = AlarmScheduler(refresh=options['refresh'], batch_size=options['batch_size'])
+        until = timezone.now() + datetime.timedelta(seconds=options['seconds']) if options['seconds'] else None
+        try:
+            scheduler.run(until)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Alarmas disparadas: {scheduler.fired}'))
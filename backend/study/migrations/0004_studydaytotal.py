@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:10
+
+import datetime
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def contribution(state):
+    # Copia de study.stats.contribution: la migración no depende del código vivo
+    user_id, subject_id, start, end = state
+    tz = timezone.get_current_timezone()
+    cursor, end = start.astimezone(tz), end.astimezone(tz)
+    totals = {}
+    while cursor < end:
+        midnight = datetime.datetime.combine(cursor.date() + datetime.timedelta(days=1), datetime.time.min, tzinfo=tz)
+        piece_end = min(midnight, end)
+        seconds = round(piece_end.timestamp()) - round(cursor.timestamp())
+        if seconds > 0:
+            totals[(user_id, subject_id, cursor.date())] = [seconds, 0 if totals else 1]
+        cursor = piece_end
+    return totals
+
+
+def fill_day_totals(apps, schema_editor):
+    StudySession = apps.get_model('study', 'StudySession')
+    StudyDayTotal = apps.get_model('study', 'StudyDayTotal')
+    merged = {}
+    rows = StudySession.objects.filter(end_time__isnull=False).values_list('user_id', 'subject_id', 'start_time', 'end_time')
+    for state in rows.iterator(chunk_size=1000):
+        for key, (seconds, count) in contribution(state).items():
+            total = merged.setdefault(key, [0, 0])
+            total[0] += seconds
+            total[1] += count
+    StudyDayTotal.objects.bulk_create(
+        [
+            StudyDayTotal(user_id=user_id, subject_id=subject_id, day=day, seconds=seconds, sessions=count)
+            for (user_id, subject_id, day), (seconds, count) in merged.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('study', '0003_subject_alter_studysession_subject'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudyDayTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='día')),
+                ('seconds', models.PositiveIntegerField(default=0, verbose_name='segundos')),
+                ('sessions', models.PositiveIntegerField(default=0, verbose_name='sesiones')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_totals', to='study.subject')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='study_day_totals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'total diario de estudio',
+                'verbose_name_plural': 'totales diarios de estudio',
+                'indexes': [models.Index(fields=['user', 'day'], name='study_day_total_user_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'subject', 'day'), name='study_day_total_unique')],
+            },
+        ),
+        migrations.RunPython(fill_day_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:12
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def contribution(state):
+    # Copia de study.stats.contribution: la migración no depende del código vivo
+    user_id, subject_id, start, end = state
+    tz = timezone.get_current_timezone()
+    cursor, end = start.astimezone(tz), end.astimezone(tz)
+    totals = {}
+    while cursor < end:
+        midnight = datetime.datetime.combine(cursor.date() + datetime.timedelta(days=1), datetime.time.min, tzinfo=tz)
+        piece_end = min(midnight, end)
+        seconds = round(piece_end.timestamp()) - round(cursor.timestamp())
+        if seconds > 0:
+            totals[(user_id, subject_id, cursor.date())] = [seconds, 0 if totals else 1]
+        cursor = piece_end
+    return totals
+
+
+def close_duplicate_sessions(apps, schema_editor):
+    # Cada sesión abierta sobrante termina cuando empezó la siguiente del usuario
+    StudySession = apps.get_model('study', 'StudySession')
+    StudyDayTotal = apps.get_model('study', 'StudyDayTotal')
+    open_sessions = StudySession.objects.filter(end_time__isnull=True).order_by('user_id', 'start_time', 'pk')
+    previous = None
+    for session in open_sessions.iterator():
+        if previous is not None and previous.user_id == session.user_id:
+            previous.end_time = max(session.start_time, previous.start_time)
+            previous.duration = previous.end_time - previous.start_time
+            previous.save(update_fields=['end_time', 'duration'])
+            state = (previous.user_id, previous.subject_id, previous.start_time, previous.end_time)
+            for (user_id, subject_id, day), (seconds, count) in contribution(state).items():
+                total, _ = StudyDayTotal.objects.get_or_create(user_id=user_id, subject_id=subject_id, day=day)
+                StudyDayTotal.objects.filter(pk=total.pk).update(
+                    seconds=F('seconds') + seconds, sessions=F('sessions') + count,
+                )
+        previous = session
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('study', '0004_studydaytotal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_sessions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='studysession',
+            constraint=models.UniqueConstraint(condition=models.Q(('end_time__isnull', True)), fields=('user',), name='study_one_open_session', violation_error_message='Este usuario ya tiene una sesión de estudio activa.'),
+        ),
+    ]
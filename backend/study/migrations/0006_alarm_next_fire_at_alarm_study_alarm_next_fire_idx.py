@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:14
+
+from django.conf import settings
+import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def next_fire_time(alarm_time, days, after):
+    # Copia de study.alarms.next_fire_time: la migración no depende del código vivo
+    days = {day for day in days or () if isinstance(day, int) and 0 <= day <= 6}
+    if not days:
+        return None
+    tz = timezone.get_current_timezone()
+    today = after.astimezone(tz).date()
+    for offset in range(8):
+        day = today + datetime.timedelta(days=offset)
+        if day.weekday() in days:
+            candidate = datetime.datetime.combine(day, alarm_time, tzinfo=tz)
+            if candidate > after:
+                return candidate
+    return None
+
+
+def schedule_alarms(apps, schema_editor):
+    Alarm = apps.get_model('study', 'Alarm')
+    now = timezone.now()
+    alarms = []
+    for alarm in Alarm.objects.filter(is_active=True).iterator(chunk_size=1000):
+        alarm.next_fire_at = next_fire_time(alarm.time, alarm.days, now)
+        alarms.append(alarm)
+    Alarm.objects.bulk_update(alarms, ['next_fire_at'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('study', '0005_studysession_study_one_open_session'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alarm',
+            name='next_fire_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='próximo aviso'),
+        ),
+        migrations.AddIndex(
+            model_name='alarm',
+            index=models.Index(fields=['next_fire_at'], name='study_alarm_next_fire_idx'),
+        ),
+        migrations.RunPython(schedule_alarms, migrations.RunPython.noop),
+    ]
@@ -26,15 +26,29 @@ class Alarm(models.Model):
     )
     is_active = models.BooleanField(_('activa'), default=True)
     created_at = models.DateTimeField(_('creada'), auto_now_add=True)
+    # Lo mantienen save() y el planificador (study/alarms.py)
+    next_fire_at = models.DateTimeField(_('próximo aviso'), null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name = _('alarma')
         verbose_name_plural = _('alarmas')
         ordering = ['time']
+        indexes = [
+            models.Index(fields=['next_fire_at'], name='study_alarm_next_fire_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.time}"
 
+    def save(self, *args, **kwargs):
+        from .alarms import next_fire_time
+
+        self.next_fire_at = next_fire_time(self.time, self.days, timezone.now()) if self.is_active else None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'next_fire_at'}
+        super().save(*args, **kwargs)
+
 
 class PomodoroSettings(models.Model):
     """Configuración personal de pomodoro para cada usuario."""
@@ -140,6 +154,17 @@ class StudySession(models.Model):
         indexes = [
             models.Index(fields=['user', 'subject', 'start_time']),
         ]
+        constraints = [
+            # Una sola sesión abierta por usuario; el índice parcial sirve también la
+            # búsqueda. MySQL no admite índices parciales (models.W036): allí sólo
+            # protege el bloqueo del usuario en study/sessions.py:start_session
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(end_time__isnull=True),
+                name='study_one_open_session',
+                violation_error_message=_('Este usuario ya tiene una sesión de estudio activa.'),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.subject.name if self.subject else 'Sin asignatura'} - {self.start_time.date()}"
@@ -171,3 +196,29 @@ class Subject(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class StudyDayTotal(models.Model):
+    """
+    Tiempo estudiado por usuario, asignatura y día (hora local). Lo mantienen
+    los handlers de StudySession (study/signals.py); las estadísticas leen
+    sólo esta tabla.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='study_day_totals')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='day_totals')
+    day = models.DateField(_('día'))
+    seconds = models.PositiveIntegerField(_('segundos'), default=0)
+    sessions = models.PositiveIntegerField(_('sesiones'), default=0)
+
+    class Meta:
+        verbose_name = _('total diario de estudio')
+        verbose_name_plural = _('totales diarios de estudio')
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'subject', 'day'], name='study_day_total_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'day'], name='study_day_total_user_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.subject_id} {self.day}: {self.seconds}s'
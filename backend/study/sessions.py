@@ -0,0 +1,78 @@
+"""
+Sesión de estudio activa (sin end_time) de cada usuario.
+
+Como mucho hay una por usuario: `start_session` bloquea la fila del
+usuario para serializar los inicios, y donde el motor admite índices
+parciales (SQLite, PostgreSQL; MySQL no) el índice único
+`study_one_open_session` lo garantiza también frente a cualquier otra
+escritura y sirve la búsqueda. La sesión activa se guarda en caché por
+usuario y en el propio objeto user durante la petición; los handlers de
+StudySession (study/signals.py) la borran al crear, terminar o eliminar
+una sesión.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import StudySession
+
+ACTIVE_TIMEOUT = 60 * 60
+_NONE = 0  # cache.get() devuelve None cuando no hay entrada
+
+
+class ActiveSessionExists(Exception):
+    def __init__(self, session):
+        super().__init__(f'Ya hay una sesión activa: {session}')
+        self.session = session
+
+
+def _key(user_id):
+    return f'study:active:{user_id}'
+
+
+def active_session(user):
+    """Sesión abierta de `user` (con subject cargado) o None."""
+    if hasattr(user, '_active_study_session'):
+        return user._active_study_session
+    session = cache.get(_key(user.pk))
+    if session is None:
+        session = StudySession.objects.filter(user=user, end_time__isnull=True).select_related('subject').first()
+        cache.set(_key(user.pk), session or _NONE, ACTIVE_TIMEOUT)
+    user._active_study_session = session or None
+    return user._active_study_session
+
+
+def forget_active_sessions(user_ids):
+    cache.delete_many([_key(pk) for pk in user_ids])
+
+
+def start_session(user, subject, replace=True):
+    """
+    Abre una sesión de `subject`. Si ya había otra abierta se termina ahora
+    (`replace`) o se lanza ActiveSessionExists. Devuelve (nueva, anterior).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # Serializa los inicios del usuario aunque el motor no tenga el índice parcial
+        get_user_model().objects.select_for_update().only('pk').get(pk=user.pk)
+        previous = (
+            StudySession.objects.select_for_update()
+            .filter(user=user, end_time__isnull=True).select_related('subject').first()
+        )
+        if previous is not None:
+            if not replace:
+                raise ActiveSessionExists(previous)
+            previous.end_time = max(now, previous.start_time)
+            previous.save(update_fields=['end_time', 'duration'])
+        try:
+            with transaction.atomic():
+                session = StudySession.objects.create(user=user, subject=subject, start_time=now)
+        except IntegrityError:
+            # Otra petición abrió una sesión a la vez (el índice único lo impide)
+            user.__dict__.pop('_active_study_session', None)
+            forget_active_sessions([user.pk])
+            raise ActiveSessionExists(active_session(user))
+    session.subject = subject
+    user._active_study_session = session
+    return session, previous
@@ -1,9 +1,70 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django.conf import settings
-from .models import PomodoroSettings
+from django.db import transaction
+from profiles.cache import friend_user_ids
+from .leaderboard import forget_leaderboards
+from .models import PomodoroSettings, StudySession
+from .sessions import forget_active_sessions
+from .stats import apply_change, session_state
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def ensure_pomodoro_settings(sender, instance, created, **kwargs):
     if created:
         PomodoroSettings.objects.create(user=instance)
+
+
+# Totales diarios (study/stats.py): se aplica la diferencia entre lo que
+# había en la base de datos y lo que se acaba de guardar. De paso se
+# borran las clasificaciones afectadas (study/leaderboard.py) y la sesión
+# activa cacheada (study/sessions.py)
+_STATE_FIELDS = ('user_id', 'subject_id', 'start_time', 'end_time')
+
+
+@receiver(post_init, sender=StudySession)
+def remember_session_state(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._saved_state = None
+    elif all(field in instance.__dict__ for field in _STATE_FIELDS):
+        instance._saved_state = session_state(instance)
+
+
+@receiver(pre_save, sender=StudySession)
+@receiver(pre_delete, sender=StudySession)
+def load_session_state(sender, instance, **kwargs):
+    # Cargada con only()/defer(): leer lo guardado antes de pisarlo
+    if not hasattr(instance, '_saved_state'):
+        instance._saved_state = (
+            StudySession.objects.filter(pk=instance.pk).values_list(*_STATE_FIELDS).first()
+            if instance.pk else None
+        )
+
+
+def _forget_leaderboards(*states):
+    # Sólo las sesiones terminadas cuentan: iniciar una no cambia nada
+    user_ids = {state[0] for state in states if state and state[3] is not None}
+    for user_id in list(user_ids):
+        user_ids.update(friend_user_ids(user_id))
+    transaction.on_commit(lambda: forget_leaderboards(user_ids))
+
+
+def _forget_active_sessions(*states):
+    user_ids = {state[0] for state in states if state}
+    # Tras el commit: antes, otra petición podría volver a cachear lo viejo
+    transaction.on_commit(lambda: forget_active_sessions(user_ids))
+
+
+@receiver(post_save, sender=StudySession)
+def update_day_totals(sender, instance, created, **kwargs):
+    old, new = None if created else instance._saved_state, session_state(instance)
+    apply_change(old, new)
+    _forget_leaderboards(old, new)
+    _forget_active_sessions(old, new)
+    instance._saved_state = new
+
+
+@receiver(post_delete, sender=StudySession)
+def discount_day_totals(sender, instance, **kwargs):
+    apply_change(instance._saved_state, None)
+    _forget_leaderboards(instance._saved_state)
+    _forget_active_sessions(instance._saved_state)
@@ -0,0 +1,200 @@
+"""
+Estadísticas de estudio a partir de los totales diarios (StudyDayTotal).
+
+Cada sesión terminada aporta sus segundos a los días (hora local) en que
+transcurrió: las que cruzan la medianoche se reparten entre ambos días y
+cuentan como sesión el día en que empezaron. Al guardar o borrar una
+sesión se resta su aportación anterior y se suma la nueva
+(study/signals.py). Lo que no pase por save()/delete() (update() en
+bloque, SQL a mano) se corrige con el comando `rebuild_study_totals`.
+"""
+import datetime
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Greatest, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import StudyDayTotal, StudySession
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def split_by_day(start, end, tz=None):
+    """[(día, segundos)] del intervalo [start, end) en la zona `tz` (función pura)."""
+    if start is None or end is None or end <= start:
+        return []
+    tz = tz or timezone.get_current_timezone()
+    cursor = start.astimezone(tz)
+    end = end.astimezone(tz)
+    pieces = []
+    while cursor < end:
+        midnight = datetime.datetime.combine(cursor.date() + datetime.timedelta(days=1), datetime.time.min, tzinfo=tz)
+        piece_end = min(midnight, end)
+        # Restar timestamps (no fechas locales) para respetar los cambios de hora
+        seconds = round(piece_end.timestamp()) - round(cursor.timestamp())
+        if seconds > 0:
+            pieces.append((cursor.date(), seconds))
+        cursor = piece_end
+    return pieces
+
+
+def contribution(state, tz=None):
+    """{(user_id, subject_id, día): [segundos, sesiones]} que aporta una sesión."""
+    totals = {}
+    if state is None:
+        return totals
+    user_id, subject_id, start, end = state
+    for i, (day, seconds) in enumerate(split_by_day(start, end, tz)):
+        totals[(user_id, subject_id, day)] = [seconds, 1 if i == 0 else 0]
+    return totals
+
+
+def session_state(session):
+    return session.user_id, session.subject_id, session.start_time, session.end_time
+
+
+def _add(user_id, subject_id, day, seconds, sessions):
+    rows = StudyDayTotal.objects.filter(user_id=user_id, subject_id=subject_id, day=day)
+    changes = {
+        'seconds': Greatest(F('seconds') + seconds, Value(0)),
+        'sessions': Greatest(F('sessions') + sessions, Value(0)),
+    }
+    updated = rows.update(**changes)
+    if seconds < 0 or sessions < 0:
+        # Una sesión borrada o acortada puede dejar el día vacío
+        if updated:
+            rows.filter(seconds=0, sessions=0).delete()
+        return
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            StudyDayTotal.objects.create(
+                user_id=user_id, subject_id=subject_id, day=day, seconds=seconds, sessions=sessions,
+            )
+    except IntegrityError:
+        # Otra petición creó la fila entre el UPDATE y el INSERT
+        rows.update(**changes)
+
+
+def apply_change(old_state, new_state):
+    """Resta la aportación de `old_state` y suma la de `new_state`."""
+    deltas = defaultdict(lambda: [0, 0])
+    for key, (seconds, sessions) in contribution(old_state).items():
+        deltas[key][0] -= seconds
+        deltas[key][1] -= sessions
+    for key, (seconds, sessions) in contribution(new_state).items():
+        deltas[key][0] += seconds
+        deltas[key][1] += sessions
+    for (user_id, subject_id, day), (seconds, sessions) in sorted(deltas.items()):
+        if seconds or sessions:
+            _add(user_id, subject_id, day, seconds, sessions)
+
+
+def rebuild_day_totals(user_ids=None):
+    """Recalcula desde cero los totales (de todos o de `user_ids`); devuelve filas escritas."""
+    sessions = StudySession.objects.filter(end_time__isnull=False)
+    totals = StudyDayTotal.objects.all()
+    if user_ids is not None:
+        sessions = sessions.filter(user_id__in=user_ids)
+        totals = totals.filter(user_id__in=user_ids)
+
+    merged = defaultdict(lambda: [0, 0])
+    rows = sessions.values_list('user_id', 'subject_id', 'start_time', 'end_time')
+    for state in rows.iterator(chunk_size=REBUILD_BATCH_SIZE):
+        for key, (seconds, count) in contribution(state).items():
+            merged[key][0] += seconds
+            merged[key][1] += count
+
+    with transaction.atomic():
+        totals.delete()
+        StudyDayTotal.objects.bulk_create(
+            [
+                StudyDayTotal(user_id=user_id, subject_id=subject_id, day=day, seconds=seconds, sessions=count)
+                for (user_id, subject_id, day), (seconds, count) in merged.items()
+            ],
+            batch_size=REBUILD_BATCH_SIZE,
+        )
+    return len(merged)
+
+
+# Lectura
+
+def format_seconds(seconds):
+    hours, rest = divmod(int(seconds or 0), 3600)
+    return f'{hours} h {rest // 60:02d} min' if hours else f'{rest // 60} min'
+
+
+def _entry(day, seconds):
+    return {'day': day, 'seconds': seconds, 'label': format_seconds(seconds)}
+
+
+def streaks(days, today):
+    """(racha actual, racha más larga) en días seguidos de una lista ordenada de días."""
+    longest = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and (day - previous).days == 1 else 1
+        longest = max(longest, run)
+        previous = day
+    # La racha sigue viva si se estudió hoy o ayer
+    current = run if previous is not None and (today - previous).days <= 1 else 0
+    return current, longest
+
+
+def study_stats(user, today=None, days=7, weeks=8, months=6):
+    """Totales diarios, semanales, mensuales, por asignatura y rachas de `user`."""
+    today = today or timezone.localdate()
+    rows = StudyDayTotal.objects.filter(user=user, seconds__gt=0)
+
+    since = today - datetime.timedelta(days=days - 1)
+    per_day = dict(
+        rows.filter(day__gte=since).values('day').annotate(total=Sum('seconds')).values_list('day', 'total')
+    )
+    daily = [_entry(since + datetime.timedelta(days=i), per_day.get(since + datetime.timedelta(days=i), 0)) for i in range(days)]
+
+    week_start = today - datetime.timedelta(days=today.weekday())
+    first_week = week_start - datetime.timedelta(weeks=weeks - 1)
+    per_week = dict(
+        rows.filter(day__gte=first_week).annotate(week=TruncWeek('day'))
+        .values('week').annotate(total=Sum('seconds')).values_list('week', 'total')
+    )
+    weekly = [
+        _entry(first_week + datetime.timedelta(weeks=i), per_week.get(first_week + datetime.timedelta(weeks=i), 0))
+        for i in range(weeks)
+    ]
+
+    month_starts = []
+    year, month = today.year, today.month
+    for _ in range(months):
+        month_starts.append(datetime.date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    month_starts.reverse()
+    per_month = dict(
+        rows.filter(day__gte=month_starts[0]).annotate(month=TruncMonth('day'))
+        .values('month').annotate(total=Sum('seconds')).values_list('month', 'total')
+    )
+    monthly = [_entry(start, per_month.get(start, 0)) for start in month_starts]
+
+    subjects = [
+        {**row, 'label': format_seconds(row['total'])}
+        for row in rows.filter(day__gte=month_starts[-1]).values('subject__name')
+        .annotate(total=Sum('seconds')).order_by('-total')
+    ]
+
+    current, longest = streaks(rows.values_list('day', flat=True).distinct().order_by('day'), today)
+    all_time = rows.aggregate(total=Sum('seconds'))['total'] or 0
+    return {
+        'today': _entry(today, per_day.get(today, 0)),
+        'week': _entry(week_start, weekly[-1]['seconds']),
+        'month': _entry(month_starts[-1], monthly[-1]['seconds']),
+        'all_time': _entry(None, all_time),
+        'daily': daily,
+        'weekly': weekly,
+        'monthly': monthly,
+        'subjects': subjects,
+        'current_streak': current,
+        'longest_streak': longest,
+    }
@@ -1,3 +1,109 @@
-from django.test import TestCase
+import datetime
+import zoneinfo
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from .alarms import next_fire_time
+from .models import StudyDayTotal, StudySession, Subject
+from .stats import split_by_day
+
+UTC = datetime.timezone.utc
+MADRID = zoneinfo.ZoneInfo('Europe/Madrid')
+
+
+def at(*args, tz=UTC):
+    return datetime.datetime(*args, tzinfo=tz)
+
+
+class SplitByDayTests(SimpleTestCase):
+    def test_same_day(self):
+        self.assertEqual(
+            split_by_day(at(2024, 5, 6, 10), at(2024, 5, 6, 11, 30), UTC),
+            [(datetime.date(2024, 5, 6), 5400)],
+        )
+
+    def test_across_midnight(self):
+        self.assertEqual(
+            split_by_day(at(2024, 5, 6, 23, 15), at(2024, 5, 7, 0, 45), UTC),
+            [(datetime.date(2024, 5, 6), 2700), (datetime.date(2024, 5, 7), 2700)],
+        )
+
+    def test_local_midnight(self):
+        # 21:30-22:30 UTC son 23:30-00:30 en Madrid (verano, UTC+2)
+        self.assertEqual(
+            split_by_day(at(2024, 5, 6, 21, 30), at(2024, 5, 6, 22, 30), MADRID),
+            [(datetime.date(2024, 5, 6), 1800), (datetime.date(2024, 5, 7), 1800)],
+        )
+
+    def test_spring_forward(self):
+        # 31/03/2024 a las 02:00 se pasa a las 03:00: de 00:00 a 04:00 hay 3 horas
+        self.assertEqual(
+            split_by_day(at(2024, 3, 30, 23, tz=MADRID), at(2024, 3, 31, 4, tz=MADRID), MADRID),
+            [(datetime.date(2024, 3, 30), 3600), (datetime.date(2024, 3, 31), 3 * 3600)],
+        )
+
+    def test_fall_back(self):
+        # 27/10/2024 a las 03:00 se vuelve a las 02:00: de 00:00 a 04:00 hay 5 horas
+        self.assertEqual(
+            split_by_day(at(2024, 10, 26, 23, tz=MADRID), at(2024, 10, 27, 4, tz=MADRID), MADRID),
+            [(datetime.date(2024, 10, 26), 3600), (datetime.date(2024, 10, 27), 5 * 3600)],
+        )
+
+    def test_empty_or_reversed(self):
+        self.assertEqual(split_by_day(at(2024, 5, 6, 10), None, UTC), [])
+        self.assertEqual(split_by_day(at(2024, 5, 6, 10), at(2024, 5, 6, 9), UTC), [])
+
+
+class NextFireTimeTests(SimpleTestCase):
+    seven = datetime.time(7, 0)
+
+    def test_later_today(self):
+        # 01/01/2024 es lunes (weekday 0)
+        self.assertEqual(next_fire_time(self.seven, [0], at(2024, 1, 1, 6), UTC), at(2024, 1, 1, 7))
+
+    def test_strictly_after(self):
+        self.assertEqual(next_fire_time(self.seven, [0], at(2024, 1, 1, 7), UTC), at(2024, 1, 8, 7))
+
+    def test_next_selected_day(self):
+        self.assertEqual(next_fire_time(self.seven, [2, 4], at(2024, 1, 1, 8), UTC), at(2024, 1, 3, 7))
+        self.assertEqual(next_fire_time(self.seven, [2, 4], at(2024, 1, 3, 8), UTC), at(2024, 1, 5, 7))
+
+    def test_no_days(self):
+        self.assertIsNone(next_fire_time(self.seven, [], at(2024, 1, 1), UTC))
+        self.assertIsNone(next_fire_time(self.seven, None, at(2024, 1, 1), UTC))
+        self.assertIsNone(next_fire_time(self.seven, [7, 'lunes'], at(2024, 1, 1), UTC))
+
+    def test_local_time_across_dst(self):
+        every_day = range(7)
+        # Antes del cambio las 07:00 de Madrid son las 06:00 UTC; después, las 05:00
+        fire_at = next_fire_time(self.seven, every_day, at(2024, 3, 30, 8, tz=MADRID), MADRID)
+        self.assertEqual(fire_at, at(2024, 3, 31, 5))
+        fire_at = next_fire_time(self.seven, every_day, at(2024, 10, 26, 8, tz=MADRID), MADRID)
+        self.assertEqual(fire_at, at(2024, 10, 27, 6))
+
+
+class DayTotalsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('estudiante', password='x')
+        self.subject = Subject.objects.create(user=self.user, name='Mates')
+
+    def totals(self):
+        return list(StudyDayTotal.objects.values_list('day', 'seconds', 'sessions'))
+
+    def test_session_updates_and_removes_totals(self):
+        session = StudySession.objects.create(
+            user=self.user, subject=self.subject,
+            start_time=at(2024, 5, 6, 23), end_time=at(2024, 5, 7, 1),
+        )
+        self.assertCountEqual(self.totals(), [
+            (datetime.date(2024, 5, 6), 3600, 1), (datetime.date(2024, 5, 7), 3600, 0),
+        ])
+
+        # Acortarla vacía el segundo día: la fila desaparece
+        session.end_time = at(2024, 5, 6, 23, 30)
+        session.save()
+        self.assertEqual(self.totals(), [(datetime.date(2024, 5, 6), 1800, 1)])
+
+        session.delete()
+        self.assertEqual(self.totals(), [])
@@ -6,6 +6,7 @@ from .views import (
     PomodoroView,
     SubjectCreateView,
     ActiveSessionView,
+    StudyStatsView,
 )
 
 app_name = "study"
@@ -16,5 +17,6 @@ urlpatterns = [
     path("end/<int:pk>/", EndSessionView.as_view(), name="end_session"),
     path("active/<int:pk>/", ActiveSessionView.as_view(), name="active_session"),
     path("pomodoro/", PomodoroView.as_view(), name="pomodoro"),
+    path("stats/", StudyStatsView.as_view(), name="stats"),
     path("subject/create/", SubjectCreateView.as_view(), name="subject_create"),
 ]
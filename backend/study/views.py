@@ -5,24 +5,28 @@ from django.views.generic import ListView, TemplateView
 from django.views.generic.edit import CreateView
 from django.urls import reverse_lazy
 from django.utils import timezone
-from django.http import HttpResponseBadRequest, JsonResponse
+from django.http import JsonResponse
 from django.contrib import messages
-from django.db import transaction
-from .models import StudySession, Subject, PomodoroSettings
 from django.urls import reverse
 
 
 from .models import StudySession, Subject
 from .forms import SubjectForm
+from .leaderboard import friends_leaderboard
+from .sessions import ActiveSessionExists, active_session, start_session
+from .stats import study_stats
 
 
 class StartSessionView(LoginRequiredMixin, View):
-    """Inicia una nueva sesión de estudio. GET muestra formulario; POST crea la sesión."""
+    """
+    Inicia una nueva sesión de estudio. GET muestra formulario; POST crea la
+    sesión y termina la que hubiera abierta (sólo puede haber una).
+    """
     def get(self, request):
         subjects = Subject.objects.filter(user=request.user) if Subject is not None else Subject.objects.none()
         if not subjects:
             messages.warning(request, "No hay asignaturas. Crea una asignatura antes de iniciar una sesión.")
-        return render(request, "study/start.html", {"subjects": subjects})
+        return render(request, "study/start.html", {"subjects": subjects, "active_session": active_session(request.user)})
 
     def post(self, request):
         subject_id = request.POST.get("subject")
@@ -32,12 +36,15 @@ class StartSessionView(LoginRequiredMixin, View):
 
         subject = get_object_or_404(Subject, pk=subject_id, user=request.user)
 
-        with transaction.atomic():
-            session = StudySession.objects.create(
-                user=request.user,
-                start_time=timezone.now(),
-                subject=subject
-            )
+        try:
+            session, previous = start_session(request.user, subject)
+        except ActiveSessionExists as exc:
+            messages.error(request, "Ya tienes una sesión activa.")
+            if exc.session is None:
+                return redirect("study:list")
+            return redirect(reverse("study:active_session", args=[exc.session.pk]))
+        if previous is not None:
+            messages.info(request, f"Se finalizó la sesión anterior de {previous.subject.name}.")
         messages.success(request, "Sesión iniciada.")
         # redirige a la vista activa para mostrar el reloj en tiempo real
         return redirect(reverse("study:active_session", args=[session.pk]))
@@ -74,8 +81,7 @@ class SessionListView(LoginRequiredMixin, ListView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        active = StudySession.objects.filter(user=self.request.user, end_time__isnull=True).select_related('subject').first()
-        ctx['active_session'] = active
+        ctx['active_session'] = active_session(self.request.user)
         # Pomodoro settings for the user (may be None)
         try:
             ctx['pomodoro_settings'] = getattr(self.request.user, 'pomodoro_settings', None)
@@ -84,6 +90,20 @@ class SessionListView(LoginRequiredMixin, ListView):
         return ctx
 
 
+class StudyStatsView(LoginRequiredMixin, TemplateView):
+    """Totales diarios/semanales/mensuales y rachas, leídos de StudyDayTotal."""
+    template_name = "study/stats.html"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["stats"] = study_stats(self.request.user)
+        ctx["leaderboards"] = [
+            ("Esta semana", friends_leaderboard(self.request.user, "week")),
+            ("Este mes", friends_leaderboard(self.request.user, "month")),
+        ]
+        return ctx
+
+
 class PomodoroView(LoginRequiredMixin, TemplateView):
     """Vista estática / JS para el temporizador Pomodoro."""
     template_name = "study/pomodoro.html"